@@ -6,22 +6,22 @@ consistent naming patterns that are learned over time.
 """
 
 import asyncio
+import functools
 import json
-import os
-from pathlib import Path
 from typing import Any, Optional
 
 from rich.console import Console
+from rich.live import Live
 from rich.markdown import Markdown
-from rich.panel import Panel
+from rich.markup import escape
 from rich.text import Text
-from rich.live import Live
-from rich.spinner import Spinner
-from rich.style import Style
 
 from claude_agent_sdk import (
     ClaudeAgentOptions,
     ClaudeSDKClient,
+    ClaudeSDKError,
+    CLIConnectionError,
+    ProcessError,
     tool,
     create_sdk_mcp_server,
     AssistantMessage,
@@ -29,66 +29,116 @@ from claude_agent_sdk import (
     ToolUseBlock,
 )
 
+# Token-level streaming events (older SDK builds only deliver whole messages)
+try:
+    from claude_agent_sdk import StreamEvent
+    HAS_STREAM_EVENTS = True
+except ImportError:
+    HAS_STREAM_EVENTS = False
+
+# Optional C-accelerated JSON encoder for tool results
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Optional libuv-based event loop (not available on Windows)
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
 # Rich console for styled output
 console = Console()
 
 # Buffer size for large file handling (5MB)
 MAX_BUFFER_SIZE = 5 * 1024 * 1024
 
-# Tools available to the rename agent
-ALLOWED_TOOLS = [
-    # Built-in tools
-    "Read",
-    "Glob",
-    # Custom MCP tools
-    "mcp__rename__list_files",
-    "mcp__rename__analyze_file",
-    "mcp__rename__list_document_types",
-    "mcp__rename__get_patterns",
-    "mcp__rename__add_pattern",
-    "mcp__rename__learn_pattern",
-    "mcp__rename__preview_rename",
-    "mcp__rename__apply_rename",
-    "mcp__rename__apply_batch_rename",
-    "mcp__rename__apply_pattern",
-    "mcp__rename__get_rename_history",
-    "mcp__rename__get_pattern_stats",
-]
+# Maximum characters of extracted text returned by analyze_file
+MAX_TEXT_CHARS = 30_000
+
+# Files analyze_files_batch works on at once, by default and at most
+DEFAULT_ANALYZE_CONCURRENCY = 4
+MAX_ANALYZE_CONCURRENCY = 8
+
+# Files analyzed by one analyze_files_batch call; the rest are listed for
+# another call
+MAX_BATCH_FILES = 50
+
+# Serialized size that all text and images in one analyze_files_batch result
+# may use, leaving headroom under the buffer for labels and message framing
+BATCH_RESULT_BUDGET = MAX_BUFFER_SIZE * 3 // 4
+
+# Prefix Claude Code gives tools served by the "rename" MCP server
+_MCP_TOOL_PREFIX = "mcp__rename__"
+
+# Custom MCP tools, by the short names they are registered under
+_RENAME_TOOL_NAMES = (
+    "list_files",
+    "analyze_file",
+    "analyze_files_batch",
+    "list_document_types",
+    "get_patterns",
+    "add_pattern",
+    "learn_pattern",
+    "preview_rename",
+    "apply_rename",
+    "apply_batch_rename",
+    "apply_pattern",
+    "get_rename_history",
+    "get_pattern_stats",
+)
+
+# Tools available to the rename agent: built-in tools plus the custom MCP tools
+ALLOWED_TOOLS = ("Read", "Glob") + tuple(_MCP_TOOL_PREFIX + name for name in _RENAME_TOOL_NAMES)
+
+# Display names for tool-use indicators, keyed by the full tool name
+_TOOL_DISPLAY_NAMES = {_MCP_TOOL_PREFIX + name: name for name in _RENAME_TOOL_NAMES}
 
 from .tools.file_analyzer import (
     analyze_file,
-    get_file_content,
     list_files_in_directory,
-    get_file_info,
 )
 from .tools.pattern_manager import (
     list_document_types,
     get_patterns,
-    get_pattern_for_type,
     add_pattern,
-    update_pattern,
-    delete_pattern,
     learn_pattern,
     get_pattern_stats,
     get_rename_history,
     apply_pattern_to_document,
-    record_pattern_usage,
-    set_store,
+    use_data_dir,
 )
 from .tools.file_renamer import (
     preview_rename,
     apply_rename,
     apply_batch_rename,
-    create_rename_plan,
 )
-from .patterns.pattern_store import PatternStore
-from .models.document import DocumentType
 
 
 # ============================================================================
 # MCP Tool Definitions
 # ============================================================================
 
+def _dump(obj: Any) -> str:
+    """Serialize a tool result as compact JSON for the model."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _text_response(text: str) -> dict[str, Any]:
+    """Wrap text as a successful MCP tool result."""
+    return {"content": [{"type": "text", "text": text}]}
+
+
+def _error_response(text: str) -> dict[str, Any]:
+    """Wrap text as an MCP tool error result."""
+    return {"content": [{"type": "text", "text": text}], "is_error": True}
+
+
 @tool(
     "list_files",
     "List files in a directory. Can filter by extension and scan recursively. The directory parameter is REQUIRED.",
@@ -116,7 +166,7 @@ async def tool_list_files(args: dict[str, Any]) -> dict[str, Any]:
     """List files in a directory."""
     directory = args.get("directory")
     if not directory:
-        return {"content": [{"type": "text", "text": "Error: directory parameter is required"}], "is_error": True}
+        return _error_response("Error: directory parameter is required")
 
     extensions = args.get("extensions")
     recursive = args.get("recursive", False)
@@ -124,17 +174,12 @@ async def tool_list_files(args: dict[str, Any]) -> dict[str, Any]:
     files = list_files_in_directory(directory, extensions, recursive)
 
     if not files:
-        return {"content": [{"type": "text", "text": f"No files found in: {directory}"}]}
+        return _text_response(f"No files found in: {directory}")
 
     if files and "error" in files[0]:
-        return {"content": [{"type": "text", "text": f"Error: {files[0]['error']}"}], "is_error": True}
+        return _error_response(f"Error: {files[0]['error']}")
 
-    return {
-        "content": [{
-            "type": "text",
-            "text": json.dumps(files, indent=2)
-        }]
-    }
+    return _text_response(_dump(files))
 
 
 @tool(
@@ -155,35 +200,150 @@ async def tool_analyze_file(args: dict[str, Any]) -> dict[str, Any]:
     """Analyze a single file."""
     file_path = args.get("file_path")
     if not file_path:
-        return {"content": [{"type": "text", "text": "Error: file_path is required"}], "is_error": True}
+        return _error_response("Error: file_path is required")
 
-    result = analyze_file(file_path)
+    result = await asyncio.to_thread(_analyze_for_model, file_path)
 
     if "error" in result:
-        return {"content": [{"type": "text", "text": f"Error: {result['error']}"}], "is_error": True}
+        return _error_response(f"Error: {result['error']}")
+
+    return {"content": _analysis_content(result)}
 
+
+@tool(
+    "analyze_files_batch",
+    "Analyze several files in one call. Images and text files are read concurrently; PDFs are processed one at a time. Files that don't fit in one result are listed so they can be analyzed in another call. Prefer this over repeated analyze_file calls when processing a batch.",
+    {
+        "type": "object",
+        "properties": {
+            "file_paths": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": f"Full paths of the files to analyze (at most {MAX_BATCH_FILES} per call). REQUIRED."
+            },
+            "concurrency": {
+                "type": "integer",
+                "description": f"How many files to analyze at once (default {DEFAULT_ANALYZE_CONCURRENCY}, max {MAX_ANALYZE_CONCURRENCY})"
+            }
+        },
+        "required": ["file_paths"]
+    }
+)
+async def tool_analyze_files_batch(args: dict[str, Any]) -> dict[str, Any]:
+    """Analyze multiple files concurrently."""
+    file_paths = args.get("file_paths")
+    if not file_paths or not isinstance(file_paths, list):
+        return _error_response("Error: file_paths is required")
+
+    try:
+        concurrency = int(args.get("concurrency") or DEFAULT_ANALYZE_CONCURRENCY)
+    except (TypeError, ValueError):
+        concurrency = DEFAULT_ANALYZE_CONCURRENCY
+    semaphore = asyncio.Semaphore(max(1, min(concurrency, MAX_ANALYZE_CONCURRENCY)))
+
+    # Files past the per-call limit are not analyzed, only listed
+    left_out = file_paths[MAX_BATCH_FILES:]
+    file_paths = file_paths[:MAX_BATCH_FILES]
+
+    async def analyze_one(file_path: str) -> dict[str, Any]:
+        async with semaphore:
+            return await asyncio.to_thread(_analyze_for_model, file_path)
+
+    results = await asyncio.gather(
+        *(analyze_one(file_path) for file_path in file_paths),
+        return_exceptions=True,
+    )
+
+    content = []
+    # Text and images together must keep the result within the SDK buffer
+    budget = BATCH_RESULT_BUDGET
+
+    for file_path, result in zip(file_paths, results):
+        if isinstance(result, BaseException):
+            result = {"error": str(result) or type(result).__name__}
+        if "error" in result:
+            block = {"type": "text", "text": f"File: {file_path}\nError: {result['error']}"}
+            budget -= _block_size(block)
+            content.append(block)
+            continue
+
+        blocks = _batch_blocks(result)
+        size = sum(map(_block_size, blocks))
+
+        if size > budget and result.get("image_base64") and result.get("text_content"):
+            # Keep the text and point at analyze_file for the image
+            result["image_base64"] = None
+            blocks = _batch_blocks(result) + [{
+                "type": "text",
+                "text": "[Image omitted to keep the batch result small; use analyze_file to view it]"
+            }]
+            size = sum(map(_block_size, blocks))
+
+        if size > budget:
+            left_out.append(file_path)
+            continue
+
+        budget -= size
+        content.extend(blocks)
+
+    if left_out:
+        content.append({
+            "type": "text",
+            "text": "Not analyzed, to keep this result within the size limit; "
+                    "analyze these in another call:\n" + "\n".join(map(str, left_out))
+        })
+
+    return {"content": content}
+
+
+def _batch_blocks(result: dict[str, Any]) -> list[dict[str, Any]]:
+    """Build the content blocks for one file of an analyze_files_batch result."""
+    blocks = []
+    # Label image-only results so the model knows which file they belong to
+    if not result.get("text_content"):
+        blocks.append({
+            "type": "text",
+            "text": f"File: {result['file_info']['name']}\nType: {result['content_type']}"
+        })
+    blocks.extend(_analysis_content(result))
+    return blocks
+
+
+def _block_size(block: dict[str, Any]) -> int:
+    """Upper bound on the serialized size of a tool result content block."""
+    if block["type"] == "image":
+        return len(block["source"]["data"]) + 100
+    # ASCII-escaped JSON is the largest form the text can take
+    return len(json.dumps(block["text"])) + 50
+
+
+def _analyze_for_model(file_path: str) -> dict[str, Any]:
+    """Run analyze_file with the limits used for tool results."""
+    # Text and images are capped during extraction to avoid buffer issues
+    return analyze_file(
+        file_path,
+        max_text_chars=MAX_TEXT_CHARS,
+        max_image_file_size=MAX_BUFFER_SIZE,
+    )
+
+
+def _analysis_content(result: dict[str, Any]) -> list[dict[str, Any]]:
+    """Build tool result content blocks from an analyze_file result."""
     # Return text content and/or image for Claude to analyze
     content = []
 
     if result.get("text_content"):
-        # Limit text content to avoid buffer issues (max 50KB)
-        text = result["text_content"]
-        if len(text) > 50000:
-            text = text[:50000] + "\n\n[...truncated due to size...]"
-
         content.append({
             "type": "text",
-            "text": f"File: {result['file_info']['name']}\nType: {result['content_type']}\n\nContent:\n{text}"
+            "text": f"File: {result['file_info']['name']}\nType: {result['content_type']}\n\nContent:\n{result['text_content']}"
         })
 
-    # Skip image for large files to avoid buffer issues
-    file_size = result.get("file_info", {}).get("size", 0)
-    if result.get("image_base64") and file_size < MAX_BUFFER_SIZE:
+    if result.get("image_base64"):
         content.append({
             "type": "image",
             "source": {
                 "type": "base64",
-                "media_type": "image/png" if result["content_type"] == "pdf" else "image/jpeg",
+                "media_type": "image/jpeg",
                 "data": result["image_base64"]
             }
         })
@@ -191,10 +351,10 @@ async def tool_analyze_file(args: dict[str, Any]) -> dict[str, Any]:
     if not content:
         content.append({
             "type": "text",
-            "text": f"File info: {json.dumps(result['file_info'], indent=2)}\n\nCould not extract content for analysis."
+            "text": f"File info: {_dump(result['file_info'])}\n\nCould not extract content for analysis."
         })
 
-    return {"content": content}
+    return content
 
 
 @tool(
@@ -205,7 +365,7 @@ async def tool_analyze_file(args: dict[str, Any]) -> dict[str, Any]:
 async def tool_list_document_types(args: dict[str, Any]) -> dict[str, Any]:
     """List document types."""
     types = list_document_types()
-    return {"content": [{"type": "text", "text": json.dumps(types, indent=2)}]}
+    return _text_response(_dump(types))
 
 
 @tool(
@@ -217,7 +377,7 @@ async def tool_get_patterns(args: dict[str, Any]) -> dict[str, Any]:
     """Get patterns."""
     doc_type = args.get("document_type")
     patterns = get_patterns(doc_type)
-    return {"content": [{"type": "text", "text": json.dumps(patterns, indent=2)}]}
+    return _text_response(_dump(patterns))
 
 
 @tool(
@@ -244,7 +404,7 @@ async def tool_add_pattern(args: dict[str, Any]) -> dict[str, Any]:
         match_institutions=args.get("match_institutions"),
         priority=args.get("priority", 5),
     )
-    return {"content": [{"type": "text", "text": json.dumps(result, indent=2)}]}
+    return _text_response(_dump(result))
 
 
 @tool(
@@ -263,7 +423,7 @@ async def tool_learn_pattern(args: dict[str, Any]) -> dict[str, Any]:
         pattern=args.get("pattern"),
         institution=args.get("institution"),
     )
-    return {"content": [{"type": "text", "text": f"Learned pattern: {json.dumps(result, indent=2)}"}]}
+    return _text_response(f"Learned pattern: {_dump(result)}")
 
 
 @tool(
@@ -282,7 +442,7 @@ async def tool_preview_rename(args: dict[str, Any]) -> dict[str, Any]:
         new_name=args.get("new_name"),
         destination_dir=args.get("destination_dir"),
     )
-    return {"content": [{"type": "text", "text": json.dumps(result, indent=2)}]}
+    return _text_response(_dump(result))
 
 
 @tool(
@@ -305,7 +465,7 @@ async def tool_apply_rename(args: dict[str, Any]) -> dict[str, Any]:
         pattern_id=args.get("pattern_id"),
         document_type=args.get("document_type"),
     )
-    return {"content": [{"type": "text", "text": json.dumps(result, indent=2)}]}
+    return _text_response(_dump(result))
 
 
 @tool(
@@ -321,14 +481,17 @@ async def tool_apply_rename(args: dict[str, Any]) -> dict[str, Any]:
 )
 async def tool_apply_batch_rename(args: dict[str, Any]) -> dict[str, Any]:
     """Apply batch rename."""
-    result = apply_batch_rename(
+    # Run the file operations in a worker thread so a large batch doesn't
+    # stall the SDK's message pump on the event loop
+    result = await asyncio.to_thread(
+        apply_batch_rename,
         renames=args.get("renames", []),
         destination_dir=args.get("destination_dir"),
         pattern_id=args.get("pattern_id"),
         document_type=args.get("document_type"),
         dry_run=args.get("dry_run", False),
     )
-    return {"content": [{"type": "text", "text": json.dumps(result, indent=2)}]}
+    return _text_response(_dump(result))
 
 
 @tool(
@@ -345,7 +508,7 @@ async def tool_apply_pattern(args: dict[str, Any]) -> dict[str, Any]:
         pattern=args.get("pattern", "{Description}"),
         document_info=args.get("document_info", {}),
     )
-    return {"content": [{"type": "text", "text": f"Generated filename: {result}"}]}
+    return _text_response(f"Generated filename: {result}")
 
 
 @tool(
@@ -356,7 +519,7 @@ async def tool_apply_pattern(args: dict[str, Any]) -> dict[str, Any]:
 async def tool_get_history(args: dict[str, Any]) -> dict[str, Any]:
     """Get rename history."""
     history = get_rename_history(args.get("limit", 50))
-    return {"content": [{"type": "text", "text": json.dumps(history, indent=2)}]}
+    return _text_response(_dump(history))
 
 
 @tool(
@@ -367,7 +530,7 @@ async def tool_get_history(args: dict[str, Any]) -> dict[str, Any]:
 async def tool_get_stats(args: dict[str, Any]) -> dict[str, Any]:
     """Get pattern stats."""
     stats = get_pattern_stats()
-    return {"content": [{"type": "text", "text": json.dumps(stats, indent=2)}]}
+    return _text_response(_dump(stats))
 
 
 # ============================================================================
@@ -382,6 +545,7 @@ def create_rename_mcp_server():
         tools=[
             tool_list_files,
             tool_analyze_file,
+            tool_analyze_files_batch,
             tool_list_document_types,
             tool_get_patterns,
             tool_add_pattern,
@@ -396,6 +560,11 @@ def create_rename_mcp_server():
     )
 
 
+# The tool registry is static, so build the server once and share it
+# across every session started from this process.
+_MCP_SERVER = create_rename_mcp_server()
+
+
 # ============================================================================
 # Agent System Prompt
 # ============================================================================
@@ -427,7 +596,7 @@ SYSTEM_PROMPT = """You are a specialized file renaming agent that helps users or
 
 When given multiple files or a folder:
 
-1. **List and analyze** all files to understand what you're working with
+1. **List and analyze** all files to understand what you're working with (use analyze_files_batch to analyze them in one call)
 2. **Group similar files** (e.g., all K-1 forms, all Chase statements)
 3. **For each group**:
    - Classify the document type
@@ -447,25 +616,232 @@ When given multiple files or a folder:
 - Extract accurate information from documents - dates, amounts, institutions
 - Use the **most specific pattern** available (e.g., K-1 pattern for K-1 forms, not generic tax pattern)
 
-## Example Interaction
-
-User: "Rename these K-1 tax forms for 2024"
+## Example
 
-You should:
-1. List the files in the provided location
-2. Analyze each file to extract: year, form type, institution name
-3. Find or suggest a pattern like "{Year} - K-1 - {Institution}"
-4. Generate preview names for all files
-5. Show the user the proposed renames
-6. After confirmation, apply the renames
-7. Offer to learn this pattern for future K-1 forms from these institutions
+"Rename these K-1 tax forms for 2024": list the files, analyze them with analyze_files_batch for year, form type, and institution, use or suggest "{Year} - K-1 - {Institution}", preview, apply after confirmation, then offer to learn the pattern for future K-1s.
 """
 
 
+# ============================================================================
+# Response Rendering
+# ============================================================================
+
+# Characters that can change how a line renders as markdown
+_MARKDOWN_CHARS = frozenset("*_`#[]<>|~&\\")
+
+
+def _text_renderable(text: str) -> Markdown | Text:
+    """Wrap assistant text for display, skipping the markdown parser for plain one-liners."""
+    if (
+        "\n" not in text
+        and text[:1] not in ("-", "+")
+        and not text[:1].isdigit()
+        and _MARKDOWN_CHARS.isdisjoint(text)
+    ):
+        return Text(text)
+    return Markdown(text)
+
+
+def _render_text_run(blocks: list[TextBlock]) -> None:
+    """Render a run of assistant text blocks as a single markdown document."""
+    console.print(_text_renderable("\n\n".join(block.text for block in blocks)))
+
+
+def _render_tool_use_run(blocks: list[ToolUseBlock]) -> None:
+    """Render styled indicators for a run of tool calls with a single write."""
+    indicators = " ".join(
+        f"  [dim]●[/dim] [green]{_TOOL_DISPLAY_NAMES.get(block.name, block.name)}[/green]"
+        for block in blocks
+    )
+    # Markup only; skip Rich's regex-based repr highlighter on this hot path
+    console.print(indicators, end=" ", highlight=False)
+
+
+# Renderers for runs of consecutive content blocks, keyed by exact block type
+_RUN_RENDERERS = {
+    TextBlock: _render_text_run,
+    ToolUseBlock: _render_tool_use_run,
+}
+
+
+def _render_message(message: Any, skip_text: bool = False) -> Optional[bool]:
+    """Render the content blocks of an assistant message.
+
+    Consecutive blocks of the same type are rendered together, so a burst
+    of text costs one markdown parse and a series of tool calls one write.
+
+    Args:
+        message: Message received from the SDK
+        skip_text: Don't render text blocks (they were already streamed)
+
+    Returns:
+        Whether the output ends with an inline tool indicator, or None if
+        nothing was rendered
+    """
+    if not isinstance(message, AssistantMessage):
+        return None
+
+    last_rendered = None
+    run_type = None
+    run: list[Any] = []
+    for block in message.content:
+        block_type = type(block)
+        if block_type not in _RUN_RENDERERS or (skip_text and block_type is TextBlock):
+            continue
+        if block_type is not run_type and run:
+            _RUN_RENDERERS[run_type](run)
+            last_rendered = run_type
+            run = []
+        run_type = block_type
+        run.append(block)
+
+    if run:
+        _RUN_RENDERERS[run_type](run)
+        last_rendered = run_type
+
+    if last_rendered is None:
+        return None
+    return last_rendered is ToolUseBlock
+
+
+# Redraw rate for text streamed into the live region
+STREAM_REFRESH_PER_SECOND = 20
+
+
+class _StreamingMarkdown:
+    """Markdown view of text that is still arriving.
+
+    The markdown is parsed when Live redraws, not on every delta, so parse
+    cost scales with the refresh rate rather than the number of tokens.
+    """
+
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+
+    def __rich__(self) -> Markdown | Text:
+        return _text_renderable("".join(self.chunks))
+
+
+class _TurnRenderer:
+    """Render one agent turn, streaming text as it arrives when possible."""
+
+    def __init__(self) -> None:
+        self._live: Optional[Live] = None
+        self._text: Optional[_StreamingMarkdown] = None
+        self._streamed_text = False
+        self._line_open = False
+
+    def handle(self, message: Any) -> None:
+        """Render a message or stream event received from the SDK."""
+        if HAS_STREAM_EVENTS and isinstance(message, StreamEvent):
+            self._handle_event(message.event)
+            return
+
+        self._stop_live()
+        # Text already shown from stream events arrives again in full here
+        ends_with_tool = _render_message(message, skip_text=self._streamed_text)
+        if isinstance(message, AssistantMessage):
+            self._streamed_text = False
+        if ends_with_tool is not None:
+            self._line_open = ends_with_tool
+
+    def close(self) -> None:
+        """Finish any in-progress live region."""
+        self._stop_live()
+
+    def _handle_event(self, event: dict[str, Any]) -> None:
+        event_type = event.get("type")
+        if event_type == "content_block_delta":
+            delta = event.get("delta", {})
+            if delta.get("type") == "text_delta":
+                self._append_text(delta.get("text", ""))
+        elif event_type == "content_block_stop":
+            self._stop_live()
+
+    def _append_text(self, text: str) -> None:
+        if self._live is None:
+            if self._line_open:
+                console.print()
+                self._line_open = False
+            self._text = _StreamingMarkdown()
+            self._live = Live(
+                self._text,
+                console=console,
+                refresh_per_second=STREAM_REFRESH_PER_SECOND,
+                vertical_overflow="visible",
+            )
+            self._live.start()
+        self._text.chunks.append(text)
+        self._streamed_text = True
+
+    def _stop_live(self) -> None:
+        if self._live is not None:
+            self._live.stop()
+            # Live only ends its final frame with a newline on terminals
+            if not console.is_terminal:
+                console.line()
+            self._live = None
+            self._text = None
+
+
+def _show_stats() -> None:
+    """Print pattern statistics for the interactive /stats command."""
+    stats = get_pattern_stats()
+    console.print()
+    console.print(
+        f"  [dim]Patterns:[/dim] {stats['total_patterns']} "
+        f"[dim]({stats['custom_patterns']} custom)[/dim]  "
+        f"[dim]Renames:[/dim] {stats['total_renames']}"
+    )
+    for doc_type, counts in sorted(stats["by_type"].items()):
+        console.print(
+            f"    [green]{doc_type}[/green] [dim]{counts['patterns']} patterns, "
+            f"{counts['uses']} uses[/dim]"
+        )
+
+
+def _show_history(limit: int = 10) -> None:
+    """Print recent renames for the interactive /history command."""
+    history = get_rename_history(limit)
+    console.print()
+    if not history:
+        console.print("  [dim]No rename history yet.[/dim]")
+        return
+    for entry in history:
+        console.print(
+            f"  [dim]{entry.get('timestamp', '')[:10]}[/dim] "
+            f"{escape(entry.get('original_name', ''))} [dim]→[/dim] "
+            f"[green]{escape(entry.get('new_name', ''))}[/green]"
+        )
+
+
 # ============================================================================
 # Main Agent Functions
 # ============================================================================
 
+# Separator for running several prompts in one session from the command line
+PROMPT_SEPARATOR = ";;"
+
+
+@functools.lru_cache(maxsize=None)
+def _build_options(permission_mode: str) -> ClaudeAgentOptions:
+    """Build the agent options shared by one-shot and interactive runs.
+
+    The system prompt and tool list are identical for every session, so
+    Claude Code can serve them from its prompt cache after the first request.
+    Options are memoized per permission mode; the SDK copies rather than
+    mutates them, so sessions can share one instance.
+    """
+    return ClaudeAgentOptions(
+        system_prompt=SYSTEM_PROMPT,
+        mcp_servers={"rename": _MCP_SERVER},
+        allowed_tools=list(ALLOWED_TOOLS),
+        permission_mode=permission_mode,
+        max_buffer_size=MAX_BUFFER_SIZE,
+        include_partial_messages=HAS_STREAM_EVENTS,
+    )
+
+
 async def run_rename_agent(
     prompt: str,
     data_dir: Optional[str] = None,
@@ -478,35 +854,45 @@ async def run_rename_agent(
         data_dir: Optional custom directory for pattern storage
         permission_mode: Permission mode (default, acceptEdits, bypassPermissions)
     """
+    await run_rename_prompts([prompt], data_dir, permission_mode)
+
+
+async def run_rename_prompts(
+    prompts: list[str],
+    data_dir: Optional[str] = None,
+    permission_mode: str = "default",
+) -> None:
+    """Run several prompts in order within a single agent session.
+
+    Each prompt sees the conversation so far, and the session (CLI process,
+    MCP server, system prompt) is set up only once.
+
+    Args:
+        prompts: The user's requests, in order
+        data_dir: Optional custom directory for pattern storage
+        permission_mode: Permission mode (default, acceptEdits, bypassPermissions)
+    """
     # Initialize pattern store
     if data_dir:
-        set_store(PatternStore(data_dir))
+        use_data_dir(data_dir)
 
-    # Create MCP server
-    mcp_server = create_rename_mcp_server()
-
-    # Build options
-    options = ClaudeAgentOptions(
-        system_prompt=SYSTEM_PROMPT,
-        mcp_servers={"rename": mcp_server},
-        allowed_tools=ALLOWED_TOOLS,
-        permission_mode=permission_mode,
-        max_buffer_size=MAX_BUFFER_SIZE,
-    )
+    options = _build_options(permission_mode)
 
     # Run the agent using ClaudeSDKClient (required for MCP server support)
     async with ClaudeSDKClient(options=options) as client:
-        await client.query(prompt)
+        for prompt in prompts:
+            await _run_turn(client, prompt)
+
+
+async def _run_turn(client: ClaudeSDKClient, prompt: str) -> None:
+    """Send one prompt and render the response as it streams in."""
+    await client.query(prompt)
+    renderer = _TurnRenderer()
+    try:
         async for message in client.receive_response():
-            if isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        # Render markdown for rich text output
-                        console.print(Markdown(block.text))
-                    elif isinstance(block, ToolUseBlock):
-                        # Styled tool usage indicator
-                        tool_name = block.name.replace("mcp__rename__", "")
-                        console.print(f"  [dim]●[/dim] [green]{tool_name}[/green]", end=" ")
+            renderer.handle(message)
+    finally:
+        renderer.close()
 
 
 async def run_interactive_session(
@@ -521,19 +907,9 @@ async def run_interactive_session(
     """
     # Initialize pattern store
     if data_dir:
-        set_store(PatternStore(data_dir))
+        use_data_dir(data_dir)
 
-    # Create MCP server
-    mcp_server = create_rename_mcp_server()
-
-    # Build options
-    options = ClaudeAgentOptions(
-        system_prompt=SYSTEM_PROMPT,
-        mcp_servers={"rename": mcp_server},
-        allowed_tools=ALLOWED_TOOLS,
-        permission_mode=permission_mode,
-        max_buffer_size=MAX_BUFFER_SIZE,
-    )
+    options = _build_options(permission_mode)
 
     async with ClaudeSDKClient(options=options) as client:
         while True:
@@ -556,28 +932,51 @@ async def run_interactive_session(
                     console.print("    [green]/quit[/green]    - Exit the agent")
                     continue
 
-                if not user_input:
+                # Local reports are answered from the pattern store directly
+                if user_input.lower() == "/stats":
+                    _show_stats()
                     continue
 
-                await client.query(user_input)
+                if user_input.lower() == "/history":
+                    _show_history()
+                    continue
+
+                if not user_input:
+                    continue
 
                 console.print()
-                async for message in client.receive_response():
-                    if isinstance(message, AssistantMessage):
-                        for block in message.content:
-                            if isinstance(block, TextBlock):
-                                # Render markdown for rich text
-                                console.print(Markdown(block.text))
-                            elif isinstance(block, ToolUseBlock):
-                                # Styled tool usage indicator
-                                tool_name = block.name.replace("mcp__rename__", "")
-                                console.print(f"  [dim]●[/dim] [green]{tool_name}[/green]", end=" ")
+                await _run_turn(client, user_input)
 
+            except EOFError:
+                # Ctrl-D or closed stdin: nothing more can be read
+                console.print()
+                console.print("[dim]Goodbye![/dim]")
+                break
             except KeyboardInterrupt:
                 console.print()
                 console.print("[dim]Interrupted. Type /quit to exit.[/dim]")
-            except Exception as e:
+            except (CLIConnectionError, ProcessError) as e:
+                # The Claude Code process is gone; further queries would fail too
+                console.print(f"\n[red]Session ended:[/red] {e}")
+                break
+            except ClaudeSDKError as e:
                 console.print(f"\n[red]Error:[/red] {e}")
+            except Exception as e:
+                console.print(f"\n[red]Unexpected error:[/red] {e}")
+
+
+def run_async(coro: Any) -> Any:
+    """Run a coroutine to completion, on uvloop when it is installed.
+
+    Args:
+        coro: The coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    if HAS_UVLOOP:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
 
 
 def main():
@@ -585,12 +984,16 @@ def main():
     import sys
 
     if len(sys.argv) > 1:
-        # Run with command line prompt
-        prompt = " ".join(sys.argv[1:])
-        asyncio.run(run_rename_agent(prompt))
+        # Run with command line prompt(s), sharing one session
+        prompts = [
+            p.strip()
+            for p in " ".join(sys.argv[1:]).split(PROMPT_SEPARATOR)
+            if p.strip()
+        ]
+        run_async(run_rename_prompts(prompts))
     else:
         # Run interactive session
-        asyncio.run(run_interactive_session())
+        run_async(run_interactive_session())
 
 
 if __name__ == "__main__":
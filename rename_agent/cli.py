@@ -9,9 +9,6 @@ Usage:
     rename-agent --history              # Show rename history
 """
 
-import asyncio
-import json
-import os
 from pathlib import Path
 from typing import Optional
 
@@ -19,20 +16,17 @@ import typer
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.markdown import Markdown
 from rich.text import Text
 from rich.style import Style
 
-from .agent import run_rename_agent, run_interactive_session
 from .tools.pattern_manager import (
     get_patterns,
     get_pattern_stats,
     get_rename_history,
     list_document_types,
-    set_store,
+    use_data_dir,
 )
 from .tools.file_analyzer import list_files_in_directory
-from .patterns.pattern_store import PatternStore
 
 app = typer.Typer(
     name="rename-agent",
@@ -57,14 +51,15 @@ BANNER = r"""
   AI-powered file renaming with pattern learning
 """
 
+# Banner art without its leading/trailing blank lines (indentation preserved),
+# styled once so printing it is a single console write
+_BANNER_TEXT = Text("\n".join(BANNER.split("\n")[1:-1]), style=Style(color="green"))
+
 
 def print_banner():
     """Print the styled welcome banner."""
     console.print()
-    # Split and skip empty first/last lines, but preserve indentation
-    lines = BANNER.split('\n')
-    for line in lines[1:-1]:  # Skip first empty line and last empty line
-        console.print(Text(line, style=Style(color="green")))
+    console.print(_BANNER_TEXT)
     console.print("  " + "─" * 54, style="dim")
 
 
@@ -80,6 +75,13 @@ def print_help_hint():
     console.print()
 
 
+def format_size(size: int) -> str:
+    """Format a file size in bytes as KB or MB."""
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
 def get_data_dir(data_dir: Optional[str] = None) -> str:
     """Get the data directory path."""
     if data_dir:
@@ -145,9 +147,13 @@ def main(
     if ctx.invoked_subcommand is not None:
         return
 
+    # The agent pulls in the Claude Agent SDK and MCP stack, which the
+    # report subcommands (stats, history, patterns, ...) never need
+    from .agent import run_async, run_rename_agent, run_interactive_session
+
     # Initialize data directory
     data_path = get_data_dir(data_dir)
-    set_store(PatternStore(data_path))
+    use_data_dir(data_path)
 
     # Build the prompt based on options
     if files:
@@ -179,12 +185,12 @@ def main(
         console.print()
         console.print(f"  [green]>[/green] [bold]{prompt}[/bold]")
         console.print()
-        asyncio.run(run_rename_agent(prompt, data_path, permission_mode))
+        run_async(run_rename_agent(prompt, data_path, permission_mode))
     else:
         # Interactive mode
         print_banner()
         print_help_hint()
-        asyncio.run(run_interactive_session(data_path, permission_mode))
+        run_async(run_interactive_session(data_path, permission_mode))
 
 
 @app.command()
@@ -197,7 +203,7 @@ def stats(
 ):
     """Show pattern usage statistics."""
     data_path = get_data_dir(data_dir)
-    set_store(PatternStore(data_path))
+    use_data_dir(data_path)
 
     stats_data = get_pattern_stats()
 
@@ -239,7 +245,7 @@ def history(
 ):
     """Show recent rename history."""
     data_path = get_data_dir(data_dir)
-    set_store(PatternStore(data_path))
+    use_data_dir(data_path)
 
     history_data = get_rename_history(limit)
 
@@ -253,13 +259,15 @@ def history(
     table.add_column("Original", style="red")
     table.add_column("New Name", style="green")
 
+    add_row = table.add_row
     for entry in history_data:
-        timestamp = entry.get("timestamp", "")[:10]
-        doc_type = entry.get("document_type", "")
-        original = entry.get("original_name", "")[:30]
-        new_name = entry.get("new_name", "")[:40]
-
-        table.add_row(timestamp, doc_type, original, new_name)
+        get = entry.get
+        add_row(
+            get("timestamp", "")[:10],
+            get("document_type", ""),
+            get("original_name", "")[:30],
+            get("new_name", "")[:40],
+        )
 
     console.print(table)
 
@@ -279,7 +287,7 @@ def patterns(
 ):
     """List available naming patterns."""
     data_path = get_data_dir(data_dir)
-    set_store(PatternStore(data_path))
+    use_data_dir(data_path)
 
     patterns_data = get_patterns(document_type)
 
@@ -294,8 +302,9 @@ def patterns(
     table.add_column("Uses", justify="right")
     table.add_column("Custom", justify="center")
 
+    add_row = table.add_row
     for p in patterns_data:
-        table.add_row(
+        add_row(
             p["id"][:18],
             p["document_type"],
             p["pattern"],
@@ -350,8 +359,11 @@ def preview(
     if files.is_file():
         file_list = [{"name": files.name, "path": file_path, "size": files.stat().st_size}]
     else:
-        ext_list = [e.strip() for e in extensions.split(",")] if extensions else None
-        file_list = list_files_in_directory(file_path, ext_list, recursive)
+        ext_tuple = None
+        if extensions:
+            # Normalize once; empty entries (e.g. a trailing comma) are dropped
+            ext_tuple = tuple(filter(None, (e.strip().lower() for e in extensions.split(","))))
+        file_list = list_files_in_directory(file_path, ext_tuple, recursive)
 
     if not file_list or (len(file_list) == 1 and "error" in file_list[0]):
         console.print(f"[red]Error: {file_list[0].get('error', 'No files found')}[/red]")
@@ -363,12 +375,10 @@ def preview(
     table.add_column("Size", justify="right")
 
     for f in file_list:
-        size = f.get("size", 0)
-        size_str = f"{size / 1024:.1f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.1f} MB"
         table.add_row(
             f.get("name", "")[:50],
             f.get("extension", ""),
-            size_str,
+            format_size(f.get("size", 0)),
         )
 
     console.print(table)
@@ -7,7 +7,12 @@ Run with: python -m rename_agent.mcp_server
 
 import asyncio
 import json
+import os
+import signal
+import sys
+import threading
 from pathlib import Path
+from typing import Optional
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
@@ -25,251 +30,318 @@ from .tools.pattern_manager import (
     get_pattern_stats,
     get_rename_history,
     apply_pattern_to_document,
-    set_store,
+    get_store,
+    use_data_dir,
 )
 from .tools.file_renamer import (
     preview_rename,
     apply_rename,
     apply_batch_rename,
 )
-from .patterns.pattern_store import PatternStore
 
+# Optional C-accelerated JSON encoder for tool results
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-# Initialize pattern store
+
+# Load the pattern store on a background thread so reading patterns and
+# history from disk overlaps the client handshake; call_tool waits for it
 data_dir = str(Path.home() / ".rename-agent")
-set_store(PatternStore(data_dir))
+
+# Exception raised by the background load, reported by call_tool
+_store_load_error: Optional[BaseException] = None
+
+
+def _load_store():
+    """Load the pattern store, keeping any error for call_tool to report."""
+    global _store_load_error
+    try:
+        use_data_dir(data_dir)
+    except BaseException as e:
+        _store_load_error = e
+
+
+_store_loader = threading.Thread(target=_load_store, daemon=True)
+_store_loader.start()
 
 # Create MCP server
 server = Server("rename-agent")
 
 
-@server.list_tools()
-async def list_tools():
-    """List available tools."""
-    return [
-        Tool(
-            name="rename_list_files",
-            description="List files in a directory. Can filter by extension and scan recursively.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "directory": {"type": "string", "description": "Directory path to list"},
-                    "extensions": {"type": "array", "items": {"type": "string"}, "description": "File extensions to filter (e.g., ['.pdf', '.jpg'])"},
-                    "recursive": {"type": "boolean", "description": "Scan subdirectories"},
-                },
-                "required": ["directory"],
+def _dump(result) -> str:
+    """Serialize a tool result as indented JSON, using orjson when available."""
+    if HAS_ORJSON:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2, default=str).decode("utf-8")
+    return json.dumps(result, indent=2, default=str)
+
+
+# Tool schemas are static, so the list is built once and reused
+_TOOLS = [
+    Tool(
+        name="rename_list_files",
+        description="List files in a directory. Can filter by extension and scan recursively.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "directory": {"type": "string", "description": "Directory path to list"},
+                "extensions": {"type": "array", "items": {"type": "string"}, "description": "File extensions to filter (e.g., ['.pdf', '.jpg'])"},
+                "recursive": {"type": "boolean", "description": "Scan subdirectories"},
             },
-        ),
-        Tool(
-            name="rename_analyze_file",
-            description="Analyze a file to extract content and metadata for renaming. Works with PDFs, images, and text files.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_path": {"type": "string", "description": "Path to the file to analyze"},
-                },
-                "required": ["file_path"],
+            "required": ["directory"],
+        },
+    ),
+    Tool(
+        name="rename_analyze_file",
+        description="Analyze a file to extract content and metadata for renaming. Works with PDFs, images, and text files.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_path": {"type": "string", "description": "Path to the file to analyze"},
             },
-        ),
-        Tool(
-            name="rename_list_document_types",
-            description="List all supported document types with descriptions and keywords.",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        Tool(
-            name="rename_get_patterns",
-            description="Get naming patterns, optionally filtered by document type.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "document_type": {"type": "string", "description": "Filter by document type"},
-                },
+            "required": ["file_path"],
+        },
+    ),
+    Tool(
+        name="rename_list_document_types",
+        description="List all supported document types with descriptions and keywords.",
+        inputSchema={"type": "object", "properties": {}},
+    ),
+    Tool(
+        name="rename_get_patterns",
+        description="Get naming patterns, optionally filtered by document type.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_type": {"type": "string", "description": "Filter by document type"},
             },
-        ),
-        Tool(
-            name="rename_add_pattern",
-            description="Add a new custom naming pattern. Use tokens like {Date:YYYY-MM-DD}, {Merchant}, {Amount}, {Institution}, etc.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "document_type": {"type": "string"},
-                    "pattern": {"type": "string"},
-                    "name": {"type": "string"},
-                    "description": {"type": "string"},
-                    "match_keywords": {"type": "array", "items": {"type": "string"}},
-                    "match_institutions": {"type": "array", "items": {"type": "string"}},
-                    "priority": {"type": "integer"},
-                },
-                "required": ["document_type", "pattern"],
+        },
+    ),
+    Tool(
+        name="rename_add_pattern",
+        description="Add a new custom naming pattern. Use tokens like {Date:YYYY-MM-DD}, {Merchant}, {Amount}, {Institution}, etc.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_type": {"type": "string"},
+                "pattern": {"type": "string"},
+                "name": {"type": "string"},
+                "description": {"type": "string"},
+                "match_keywords": {"type": "array", "items": {"type": "string"}},
+                "match_institutions": {"type": "array", "items": {"type": "string"}},
+                "priority": {"type": "integer"},
             },
-        ),
-        Tool(
-            name="rename_learn_pattern",
-            description="Learn and save a pattern for future use.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "document_type": {"type": "string"},
-                    "pattern": {"type": "string"},
-                    "institution": {"type": "string"},
-                },
-                "required": ["document_type", "pattern"],
+            "required": ["document_type", "pattern"],
+        },
+    ),
+    Tool(
+        name="rename_learn_pattern",
+        description="Learn and save a pattern for future use.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document_type": {"type": "string"},
+                "pattern": {"type": "string"},
+                "institution": {"type": "string"},
             },
-        ),
-        Tool(
-            name="rename_preview",
-            description="Preview a rename operation without executing it.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_path": {"type": "string"},
-                    "new_name": {"type": "string"},
-                    "destination_dir": {"type": "string"},
-                },
-                "required": ["file_path", "new_name"],
+            "required": ["document_type", "pattern"],
+        },
+    ),
+    Tool(
+        name="rename_preview",
+        description="Preview a rename operation without executing it.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_path": {"type": "string"},
+                "new_name": {"type": "string"},
+                "destination_dir": {"type": "string"},
             },
-        ),
-        Tool(
-            name="rename_apply",
-            description="Apply a rename operation to a file.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "file_path": {"type": "string"},
-                    "new_name": {"type": "string"},
-                    "destination_dir": {"type": "string"},
-                    "pattern_id": {"type": "string"},
-                    "document_type": {"type": "string"},
-                },
-                "required": ["file_path", "new_name"],
+            "required": ["file_path", "new_name"],
+        },
+    ),
+    Tool(
+        name="rename_apply",
+        description="Apply a rename operation to a file.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_path": {"type": "string"},
+                "new_name": {"type": "string"},
+                "destination_dir": {"type": "string"},
+                "pattern_id": {"type": "string"},
+                "document_type": {"type": "string"},
             },
-        ),
-        Tool(
-            name="rename_batch",
-            description="Apply multiple rename operations at once.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "renames": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "file_path": {"type": "string"},
-                                "new_name": {"type": "string"},
-                            },
+            "required": ["file_path", "new_name"],
+        },
+    ),
+    Tool(
+        name="rename_batch",
+        description="Apply multiple rename operations at once.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "renames": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "file_path": {"type": "string"},
+                            "new_name": {"type": "string"},
                         },
                     },
-                    "destination_dir": {"type": "string"},
-                    "dry_run": {"type": "boolean"},
                 },
-                "required": ["renames"],
+                "destination_dir": {"type": "string"},
+                "dry_run": {"type": "boolean"},
             },
-        ),
-        Tool(
-            name="rename_apply_pattern",
-            description="Apply a naming pattern to document info and get the resulting filename.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "pattern": {"type": "string", "description": "Pattern with tokens like {Date}, {Merchant}"},
-                    "document_info": {"type": "object", "description": "Document info with date, merchant, amount, etc."},
-                },
-                "required": ["pattern", "document_info"],
+            "required": ["renames"],
+        },
+    ),
+    Tool(
+        name="rename_apply_pattern",
+        description="Apply a naming pattern to document info and get the resulting filename.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "pattern": {"type": "string", "description": "Pattern with tokens like {Date}, {Merchant}"},
+                "document_info": {"type": "object", "description": "Document info with date, merchant, amount, etc."},
             },
-        ),
-        Tool(
-            name="rename_get_history",
-            description="Get recent rename history.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "limit": {"type": "integer", "description": "Max entries to return"},
-                },
+            "required": ["pattern", "document_info"],
+        },
+    ),
+    Tool(
+        name="rename_get_history",
+        description="Get recent rename history.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer", "description": "Max entries to return (0 for all)"},
             },
-        ),
-        Tool(
-            name="rename_get_stats",
-            description="Get statistics about pattern usage.",
-            inputSchema={"type": "object", "properties": {}},
-        ),
-    ]
+        },
+    ),
+    Tool(
+        name="rename_get_stats",
+        description="Get statistics about pattern usage.",
+        inputSchema={"type": "object", "properties": {}},
+    ),
+]
+
+
+@server.list_tools()
+async def list_tools():
+    """List available tools."""
+    return _TOOLS
+
+
+# Tool name -> handler taking the call's arguments dict
+_HANDLERS = {
+    "rename_list_files": lambda arguments: list_files_in_directory(
+        arguments.get("directory", "."),
+        arguments.get("extensions"),
+        arguments.get("recursive", False),
+    ),
+    "rename_analyze_file": lambda arguments: analyze_file(arguments["file_path"]),
+    "rename_list_document_types": lambda arguments: list_document_types(),
+    "rename_get_patterns": lambda arguments: get_patterns(arguments.get("document_type")),
+    "rename_add_pattern": lambda arguments: add_pattern(
+        document_type=arguments.get("document_type", "general"),
+        pattern=arguments.get("pattern", "{Date} - {Description}"),
+        name=arguments.get("name"),
+        description=arguments.get("description"),
+        match_keywords=arguments.get("match_keywords"),
+        match_institutions=arguments.get("match_institutions"),
+        priority=arguments.get("priority", 5),
+    ),
+    "rename_learn_pattern": lambda arguments: learn_pattern(
+        document_type=arguments.get("document_type", "general"),
+        pattern=arguments.get("pattern"),
+        institution=arguments.get("institution"),
+    ),
+    "rename_preview": lambda arguments: preview_rename(
+        file_path=arguments.get("file_path"),
+        new_name=arguments.get("new_name"),
+        destination_dir=arguments.get("destination_dir"),
+    ),
+    "rename_apply": lambda arguments: apply_rename(
+        file_path=arguments.get("file_path"),
+        new_name=arguments.get("new_name"),
+        destination_dir=arguments.get("destination_dir"),
+        pattern_id=arguments.get("pattern_id"),
+        document_type=arguments.get("document_type"),
+    ),
+    "rename_batch": lambda arguments: apply_batch_rename(
+        renames=arguments.get("renames", []),
+        destination_dir=arguments.get("destination_dir"),
+        pattern_id=arguments.get("pattern_id"),
+        document_type=arguments.get("document_type"),
+        dry_run=arguments.get("dry_run", False),
+    ),
+    "rename_apply_pattern": lambda arguments: apply_pattern_to_document(
+        pattern=arguments.get("pattern", "{Description}"),
+        document_info=arguments.get("document_info", {}),
+    ),
+    "rename_get_history": lambda arguments: get_rename_history(arguments.get("limit", 50)),
+    "rename_get_stats": lambda arguments: get_pattern_stats(),
+}
 
 
 @server.call_tool()
 async def call_tool(name: str, arguments: dict):
     """Handle tool calls."""
-    try:
-        if name == "rename_list_files":
-            result = list_files_in_directory(
-                arguments.get("directory", "."),
-                arguments.get("extensions"),
-                arguments.get("recursive", False),
-            )
-        elif name == "rename_analyze_file":
-            result = analyze_file(arguments["file_path"])
-        elif name == "rename_list_document_types":
-            result = list_document_types()
-        elif name == "rename_get_patterns":
-            result = get_patterns(arguments.get("document_type"))
-        elif name == "rename_add_pattern":
-            result = add_pattern(
-                document_type=arguments.get("document_type", "general"),
-                pattern=arguments.get("pattern", "{Date} - {Description}"),
-                name=arguments.get("name"),
-                description=arguments.get("description"),
-                match_keywords=arguments.get("match_keywords"),
-                match_institutions=arguments.get("match_institutions"),
-                priority=arguments.get("priority", 5),
-            )
-        elif name == "rename_learn_pattern":
-            result = learn_pattern(
-                document_type=arguments.get("document_type", "general"),
-                pattern=arguments.get("pattern"),
-                institution=arguments.get("institution"),
-            )
-        elif name == "rename_preview":
-            result = preview_rename(
-                file_path=arguments.get("file_path"),
-                new_name=arguments.get("new_name"),
-                destination_dir=arguments.get("destination_dir"),
-            )
-        elif name == "rename_apply":
-            result = apply_rename(
-                file_path=arguments.get("file_path"),
-                new_name=arguments.get("new_name"),
-                destination_dir=arguments.get("destination_dir"),
-                pattern_id=arguments.get("pattern_id"),
-                document_type=arguments.get("document_type"),
-            )
-        elif name == "rename_batch":
-            result = apply_batch_rename(
-                renames=arguments.get("renames", []),
-                destination_dir=arguments.get("destination_dir"),
-                pattern_id=arguments.get("pattern_id"),
-                document_type=arguments.get("document_type"),
-                dry_run=arguments.get("dry_run", False),
-            )
-        elif name == "rename_apply_pattern":
-            result = apply_pattern_to_document(
-                pattern=arguments.get("pattern", "{Description}"),
-                document_info=arguments.get("document_info", {}),
-            )
-        elif name == "rename_get_history":
-            result = get_rename_history(arguments.get("limit", 50))
-        elif name == "rename_get_stats":
-            result = get_pattern_stats()
-        else:
-            return [TextContent(type="text", text=f"Unknown tool: {name}")]
-
-        return [TextContent(type="text", text=json.dumps(result, indent=2, default=str))]
+    handler = _HANDLERS.get(name)
+    if handler is None:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
+    global _store_load_error
+    if _store_loader.is_alive():
+        # A call can arrive before the background load finishes
+        await asyncio.to_thread(_store_loader.join)
+
+    if _store_load_error is not None:
+        # Retry rather than fall back to a store for some other directory,
+        # and report the failure if it persists
+        try:
+            await asyncio.to_thread(use_data_dir, data_dir)
+        except Exception as e:
+            return [TextContent(type="text", text=f"Error: could not load pattern data from {data_dir}: {e}")]
+        _store_load_error = None
+
+    try:
+        result = handler(arguments)
+        text = _dump(result)
     except Exception as e:
         return [TextContent(type="text", text=f"Error: {str(e)}")]
 
+    return [TextContent(type="text", text=text)]
+
+
+def _on_sigterm():
+    """Save deferred pattern updates, then let SIGTERM end the process.
+
+    Hosts usually end the server with SIGTERM, which skips atexit.
+    """
+    if not _store_loader.is_alive() and _store_load_error is None:
+        try:
+            get_store().close()
+        except Exception as e:
+            print(f"rename-agent: could not save pattern data to {data_dir}: {e}", file=sys.stderr)
+    # The stdio reader blocks in a worker thread, so cancelling the server
+    # would not stop it; re-deliver the signal with its default action
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    os.kill(os.getpid(), signal.SIGTERM)
+
 
 async def main():
     """Run the MCP server."""
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, _on_sigterm)
+    except NotImplementedError:
+        # Windows event loops have no add_signal_handler
+        signal.signal(signal.SIGTERM, lambda signum, frame: loop.call_soon_threadsafe(_on_sigterm))
+
     async with stdio_server() as (read_stream, write_stream):
         await server.run(read_stream, write_stream, server.create_initialization_options())
 
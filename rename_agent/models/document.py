@@ -1,10 +1,64 @@
 """Document and pattern data models."""
 
-from dataclasses import dataclass, field
-from datetime import datetime
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from datetime import date, datetime
 from enum import Enum
 from typing import Optional
 import json
+import re
+
+# Matches a pattern token such as {Merchant} or {Date:YYYY-MM-DD}
+_TOKEN_RE = re.compile(r'\{([^}]+)\}')
+
+# Whitespace/dash cleanup applied to a filled-in pattern
+_WS_RE = re.compile(r'\s+')
+_DASH_RE = re.compile(r'\s*-\s*-\s*')
+
+
+@lru_cache(maxsize=256)
+def _substring_regex(needles: tuple[str, ...]) -> re.Pattern:
+    """Compile a rule's match keywords/institutions into one alternation.
+
+    Needles are lowercased and matched as literal substrings of lowercased
+    text, so one scan replaces a separate ``in`` check per needle.
+    """
+    return re.compile("|".join(re.escape(n.lower()) for n in needles))
+
+
+@lru_cache(maxsize=256)
+def _parse_pattern(pattern: str) -> tuple[str, ...]:
+    """Split a naming pattern into alternating literal text and token names.
+
+    Even indexes hold literal text and odd indexes hold token names, e.g.
+    ``"{Year} - {Form}"`` -> ``("", "Year", " - ", "Form", "")``.
+    """
+    return tuple(_TOKEN_RE.split(pattern))
+
+
+def _split_date(value: str) -> Optional[tuple[str, str, str]]:
+    """Split a YYYY-MM-DD date into zero-padded year, month and day.
+
+    Well-formed ISO dates are sliced directly; anything else falls back to
+    strptime, which also accepts unpadded months and days.
+
+    Returns:
+        (year, month, day) strings, or None if the value isn't a valid date
+    """
+    year, month, day = value[:4], value[5:7], value[8:]
+    if (len(value) == 10 and value[4] == "-" and value[7] == "-"
+            and year.isdigit() and month.isdigit() and day.isdigit()):
+        try:
+            date(int(year), int(month), int(day))
+        except ValueError:
+            return None
+        return year, month, day
+
+    try:
+        dt = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return dt.strftime("%Y"), dt.strftime("%m"), dt.strftime("%d")
 
 
 class DocumentType(str, Enum):
@@ -29,13 +83,19 @@ class DocumentType(str, Enum):
     @classmethod
     def from_string(cls, value: str) -> "DocumentType":
         """Convert string to DocumentType, defaulting to GENERAL."""
-        try:
-            return cls(value.lower().replace(" ", "_"))
-        except ValueError:
-            return cls.GENERAL
+        # Callers almost always pass a canonical value like "tax_document"
+        member = _DOCUMENT_TYPES_BY_VALUE.get(value)
+        if member is None:
+            member = _DOCUMENT_TYPES_BY_VALUE.get(value.lower().replace(" ", "_"), cls.GENERAL)
+        return member
+
 
+# Direct value -> member map; avoids Enum's lookup and a raised ValueError
+# for unknown types (kept outside the class so it isn't an enum member)
+_DOCUMENT_TYPES_BY_VALUE = {member.value: member for member in DocumentType}
 
-@dataclass
+
+@dataclass(slots=True)
 class DocumentInfo:
     """Information extracted from a document."""
 
@@ -61,25 +121,20 @@ class DocumentInfo:
     # AI confidence
     confidence: float = 0.0
 
+    # Values derived by match_text/get_token_values(); documents aren't
+    # modified after extraction, so these caches are never invalidated
+    _match_text: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _token_cache: Optional[dict[str, str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
-        return {
-            "file_path": self.file_path,
-            "original_name": self.original_name,
-            "document_type": self.document_type.value,
-            "date": self.date,
-            "year": self.year,
-            "month": self.month,
-            "merchant": self.merchant,
-            "amount": self.amount,
-            "account_number": self.account_number,
-            "form_type": self.form_type,
-            "institution": self.institution,
-            "description": self.description,
-            "mime_type": self.mime_type,
-            "file_size": self.file_size,
-            "confidence": self.confidence,
-        }
+        data = {name: getattr(self, name) for name in _DOCUMENT_INFO_FIELDS}
+        data["document_type"] = self.document_type.value
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> "DocumentInfo":
@@ -88,21 +143,35 @@ class DocumentInfo:
         data["document_type"] = DocumentType.from_string(data.get("document_type", "general"))
         return cls(**data)
 
+    @property
+    def match_text(self) -> str:
+        """Lowercased descriptive fields that pattern keywords are matched against."""
+        if self._match_text is None:
+            self._match_text = " ".join(filter(None, [
+                self.description,
+                self.institution,
+                self.merchant,
+                self.form_type,
+            ])).lower()
+        return self._match_text
+
     def get_token_values(self) -> dict[str, str]:
         """Get available token values for pattern substitution."""
+        if self._token_cache is not None:
+            return self._token_cache
+
         values = {}
 
         if self.date:
             values["Date"] = self.date
             values["Date:YYYY-MM-DD"] = self.date
             # Try to parse and format
-            try:
-                dt = datetime.strptime(self.date, "%Y-%m-%d")
-                values["Date:YYYY"] = dt.strftime("%Y")
-                values["Date:YYYY-MM"] = dt.strftime("%Y-%m")
-                values["Date:MM-DD"] = dt.strftime("%m-%d")
-            except ValueError:
-                pass
+            parts = _split_date(self.date)
+            if parts:
+                year, month, day = parts
+                values["Date:YYYY"] = year
+                values["Date:YYYY-MM"] = f"{year}-{month}"
+                values["Date:MM-DD"] = f"{month}-{day}"
 
         if self.year:
             values["Year"] = self.year
@@ -137,10 +206,15 @@ class DocumentInfo:
             values["Subject"] = self.description
             values["Items"] = self.description
 
+        self._token_cache = values
         return values
 
 
-@dataclass
+# Serialized fields in declaration order (private caches are init=False)
+_DOCUMENT_INFO_FIELDS = tuple(f.name for f in fields(DocumentInfo) if f.init)
+
+
+@dataclass(slots=True)
 class PatternRule:
     """A naming pattern rule that can be learned and applied."""
 
@@ -165,22 +239,17 @@ class PatternRule:
     # Is this a user-created or default pattern?
     is_custom: bool = False
 
+    # (match_keywords, match_institutions, keyword regex, institution regex);
+    # rebuilt when either list is replaced, e.g. by PatternStore.update_pattern
+    _matchers: Optional[tuple] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
-        return {
-            "id": self.id,
-            "document_type": self.document_type.value,
-            "pattern": self.pattern,
-            "name": self.name,
-            "description": self.description,
-            "use_count": self.use_count,
-            "last_used": self.last_used,
-            "created_at": self.created_at,
-            "match_keywords": self.match_keywords,
-            "match_institutions": self.match_institutions,
-            "priority": self.priority,
-            "is_custom": self.is_custom,
-        }
+        data = {name: getattr(self, name) for name in _PATTERN_RULE_FIELDS}
+        data["document_type"] = self.document_type.value
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> "PatternRule":
@@ -189,26 +258,33 @@ class PatternRule:
         data["document_type"] = DocumentType.from_string(data.get("document_type", "general"))
         return cls(**data)
 
+    def _get_matchers(self) -> tuple[Optional[re.Pattern], Optional[re.Pattern]]:
+        """Return the compiled keyword and institution matchers (None if unset)."""
+        matchers = self._matchers
+        if (matchers is None
+                or matchers[0] is not self.match_keywords
+                or matchers[1] is not self.match_institutions):
+            matchers = self._matchers = (
+                self.match_keywords,
+                self.match_institutions,
+                _substring_regex(tuple(self.match_keywords)) if self.match_keywords else None,
+                _substring_regex(tuple(self.match_institutions)) if self.match_institutions else None,
+            )
+        return matchers[2], matchers[3]
+
     def matches_document(self, doc: DocumentInfo) -> bool:
         """Check if this pattern should apply to a document."""
-        if self.document_type != doc.document_type:
+        if self.document_type is not doc.document_type:
             return False
 
-        # Check keyword matches
-        doc_text = " ".join(filter(None, [
-            doc.description,
-            doc.institution,
-            doc.merchant,
-            doc.form_type,
-        ])).lower()
+        keyword_re, institution_re = self._get_matchers()
 
-        for keyword in self.match_keywords:
-            if keyword.lower() in doc_text:
-                return True
+        # Check keyword matches
+        if keyword_re and keyword_re.search(doc.match_text):
+            return True
 
-        for institution in self.match_institutions:
-            if doc.institution and institution.lower() in doc.institution.lower():
-                return True
+        if institution_re and doc.institution and institution_re.search(doc.institution.lower()):
+            return True
 
         # If no specific matches required, it's a general pattern for this type
         if not self.match_keywords and not self.match_institutions:
@@ -218,28 +294,31 @@ class PatternRule:
 
     def apply_to_document(self, doc: DocumentInfo) -> str:
         """Apply this pattern to a document, returning the new filename."""
-        result = self.pattern
         token_values = doc.get_token_values()
 
-        # Replace all tokens
-        for token, value in token_values.items():
-            result = result.replace(f"{{{token}}}", value)
+        # Fill in the pre-split tokens; tokens without a value are removed
+        parts = list(_parse_pattern(self.pattern))
+        for i in range(1, len(parts), 2):
+            parts[i] = token_values.get(parts[i], '')
+        result = ''.join(parts)
+
+        # Clean up multiple spaces and dashes, then drop dangling separators.
+        # The regexes only run when needed: isprintable() is False for any
+        # whitespace other than a plain space, and once whitespace is single
+        # spaces, a dash run always contains "--" or "- -".
+        if '  ' in result or not result.isprintable():
+            result = _WS_RE.sub(' ', result)
+        if '--' in result or '- -' in result:
+            result = _DASH_RE.sub(' - ', result)
+        result = result.strip(' -')
 
-        # Remove any unreplaced tokens
-        import re
-        result = re.sub(r'\{[^}]+\}', '', result)
+        return result
 
-        # Clean up multiple spaces and dashes
-        result = re.sub(r'\s+', ' ', result)
-        result = re.sub(r'\s*-\s*-\s*', ' - ', result)
-        result = re.sub(r'^\s*-\s*', '', result)
-        result = re.sub(r'\s*-\s*$', '', result)
-        result = result.strip()
 
-        return result
+_PATTERN_RULE_FIELDS = tuple(f.name for f in fields(PatternRule) if f.init)
 
 
-@dataclass
+@dataclass(slots=True)
 class RenameResult:
     """Result of a rename operation."""
 
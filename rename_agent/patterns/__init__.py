@@ -1,6 +1,6 @@
 """Pattern management for file naming."""
 
 from .pattern_store import PatternStore
-from .default_patterns import DEFAULT_PATTERNS, DOCUMENT_TYPES
+from .default_patterns import DEFAULT_PATTERNS, DEFAULT_PATTERN_RULES, DOCUMENT_TYPES
 
-__all__ = ["PatternStore", "DEFAULT_PATTERNS", "DOCUMENT_TYPES"]
+__all__ = ["PatternStore", "DEFAULT_PATTERNS", "DEFAULT_PATTERN_RULES", "DOCUMENT_TYPES"]
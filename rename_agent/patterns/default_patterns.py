@@ -1,6 +1,6 @@
 """Default naming patterns for different document types."""
 
-from ..models.document import DocumentType
+from ..models.document import DocumentType, PatternRule
 
 # Document type descriptions for AI classification
 DOCUMENT_TYPES = {
@@ -303,3 +303,21 @@ DEFAULT_PATTERNS = {
         },
     ],
 }
+
+# DEFAULT_PATTERNS as PatternRule objects, built once at import. Stores
+# take copies so usage counts stay per-store.
+DEFAULT_PATTERN_RULES = tuple(
+    PatternRule(
+        id=pattern_data["id"],
+        document_type=doc_type,
+        pattern=pattern_data["pattern"],
+        name=pattern_data.get("name", ""),
+        description=pattern_data.get("description", ""),
+        match_keywords=pattern_data.get("match_keywords", []),
+        match_institutions=pattern_data.get("match_institutions", []),
+        priority=pattern_data.get("priority", 0),
+        is_custom=False,
+    )
+    for doc_type, patterns in DEFAULT_PATTERNS.items()
+    for pattern_data in patterns
+)
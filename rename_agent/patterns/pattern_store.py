@@ -1,14 +1,134 @@
 """JSON-based pattern storage with learning capabilities."""
 
+import atexit
 import json
 import os
+import stat
+import time
+from collections import defaultdict, deque
+from copy import copy
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 import uuid
+import weakref
 
 from ..models.document import DocumentInfo, DocumentType, PatternRule
-from .default_patterns import DEFAULT_PATTERNS
+from .default_patterns import DEFAULT_PATTERN_RULES
+
+# Optional C-accelerated JSON codec; the on-disk format is the same either way
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _read_json(path: Path) -> dict:
+    """Read a JSON file, using orjson when available."""
+    if HAS_ORJSON:
+        return orjson.loads(path.read_bytes())
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _atomic_write_bytes(path: Path, data: bytes, sync: bool = False):
+    """Replace a file's contents so readers never see a partial write.
+
+    Each write goes through its own temporary file, so concurrent writers
+    (threads or processes) never share or remove each other's.
+
+    Args:
+        path: File to replace
+        data: New contents
+        sync: fsync the data before the rename (slow; only worth it for
+            the final write at close)
+    """
+    tmp = path.parent / f"{path.name}.{uuid.uuid4().hex}.tmp"
+    # Created like open() would, so a new file gets the umask-derived mode
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        # Keep an existing file's mode
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _write_json(path: Path, data: dict, sync: bool = False):
+    """Write a JSON file with 2-space indentation, using orjson when available."""
+    if HAS_ORJSON:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode("utf-8")
+    _atomic_write_bytes(path, payload, sync=sync)
+
+
+def _read_json_lines(path: Path) -> tuple[list[dict], bool]:
+    """Read a JSON Lines file, skipping blank or torn (partially written) lines.
+
+    Returns:
+        (entries, clean), where clean is False if any line had to be skipped
+    """
+    loads = orjson.loads if HAS_ORJSON else json.loads
+    entries = []
+    clean = True
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                entries.append(loads(line))
+            except ValueError:
+                clean = False
+    return entries, clean
+
+
+def _json_line(data: dict) -> bytes:
+    """Encode a dict as one newline-terminated JSON line."""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data) + "\n").encode("utf-8")
+
+
+# History entries kept in memory (and after compaction, on disk)
+HISTORY_LIMIT = 1000
+
+# Compact history.jsonl back to HISTORY_LIMIT lines once it grows past this
+HISTORY_COMPACT_LINES = 10_000
+
+# Key of the marker line a compacted history log starts with, holding the
+# number of older entries compaction dropped
+COMPACTED_KEY = "compacted_renames"
+
+# Minimum seconds between pattern file writes caused by usage updates
+PATTERN_FLUSH_INTERVAL = 1.0
+
+# Memoized get_best_pattern results kept per document type
+BEST_PATTERN_CACHE_SIZE = 1024
+
+
+# Stores whose deferred writes are flushed at interpreter exit. Held weakly,
+# so replaced stores can be freed (pattern_manager closes them on replacement)
+_live_stores: "weakref.WeakSet[PatternStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_stores():
+    """Flush every store still in use; registered once for all instances."""
+    for store in list(_live_stores):
+        store.close()
 
 
 class PatternStore:
@@ -27,74 +147,159 @@ class PatternStore:
 
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.patterns_file = self.data_dir / "patterns.json"
-        self.history_file = self.data_dir / "history.json"
+        self.history_file = self.data_dir / "history.jsonl"
+        # Pre-JSONL history file, migrated on first load
+        self._legacy_history_file = self.data_dir / "history.json"
 
         self._patterns: dict[str, PatternRule] = {}
-        self._history: list[dict] = []
+        self._history_cache: Optional[deque[dict]] = None  # See _history
+        self._history_lines = 0  # Lines currently in history_file
+        self._renames_total = 0  # Renames ever logged, including compacted ones
+
+        # Usage counts are written lazily; see record_usage() and flush()
+        self._patterns_dirty = False
+        self._last_flush = 0.0
+
+        # Bumped on every mutation so callers can cache derived results
+        self._revision = 0
+
+        # Per-type match indexes (see _type_index), rebuilt after a mutation
+        self._index_by_type: dict[DocumentType, tuple] = {}
+        # Per-type lowercased institution -> learned rule (see learn_from_batch)
+        self._institutions_by_type: dict[DocumentType, dict[str, PatternRule]] = {}
+        # Per-type get_best_pattern results keyed by the fields rules match on
+        self._best_by_type: dict[DocumentType, dict[tuple, Optional[PatternRule]]] = {}
 
         self._load()
 
+        # Write any deferred usage updates when the process exits
+        _live_stores.add(self)
+
     def _load(self):
-        """Load patterns and history from disk."""
+        """Load patterns from disk (history is loaded on first use)."""
         # Load custom patterns
         if self.patterns_file.exists():
             try:
-                with open(self.patterns_file, "r") as f:
-                    data = json.load(f)
-                    for pattern_data in data.get("patterns", []):
-                        rule = PatternRule.from_dict(pattern_data)
-                        self._patterns[rule.id] = rule
+                data = _read_json(self.patterns_file)
+                for pattern_data in data.get("patterns", []):
+                    rule = PatternRule.from_dict(pattern_data)
+                    self._patterns[rule.id] = rule
             except (json.JSONDecodeError, KeyError) as e:
                 print(f"Warning: Could not load patterns: {e}")
 
-        # Load history
+        # Initialize with default patterns if no custom patterns exist
+        self._ensure_defaults()
+
+    @property
+    def _history(self) -> deque[dict]:
+        """Recent history entries, oldest first, read from disk on first use.
+
+        Commands that only work with patterns never parse the history log.
+        """
+        if self._history_cache is None:
+            self._load_history()
+        return self._history_cache
+
+    def _load_history(self):
+        """Load history from disk, migrating the pre-JSONL history file."""
+        # Bounded, so appending drops the oldest entry automatically
+        self._history_cache = deque(maxlen=HISTORY_LIMIT)
+
         if self.history_file.exists():
+            history, clean = _read_json_lines(self.history_file)
+            # A compacted log starts with a count of the entries it dropped
+            compacted = 0
+            if history and COMPACTED_KEY in history[0]:
+                compacted = history.pop(0)[COMPACTED_KEY]
+            self._history_cache.extend(history)
+            self._history_lines = len(history)
+            self._renames_total = compacted + len(history)
+            # Rewrite damaged logs so the next append starts on a fresh line
+            if not clean or self._history_lines > HISTORY_COMPACT_LINES:
+                self._compact_history()
+        elif self._legacy_history_file.exists():
             try:
-                with open(self.history_file, "r") as f:
-                    self._history = json.load(f).get("history", [])
+                history = _read_json(self._legacy_history_file).get("history", [])
+                self._history_cache.extend(history)
+                self._renames_total = len(history)
+                self._compact_history()
             except (json.JSONDecodeError, KeyError) as e:
                 print(f"Warning: Could not load history: {e}")
 
-        # Initialize with default patterns if no custom patterns exist
-        self._ensure_defaults()
-
     def _ensure_defaults(self):
         """Ensure default patterns are available."""
-        for doc_type, patterns in DEFAULT_PATTERNS.items():
-            for pattern_data in patterns:
-                if pattern_data["id"] not in self._patterns:
-                    rule = PatternRule(
-                        id=pattern_data["id"],
-                        document_type=doc_type,
-                        pattern=pattern_data["pattern"],
-                        name=pattern_data.get("name", ""),
-                        description=pattern_data.get("description", ""),
-                        match_keywords=pattern_data.get("match_keywords", []),
-                        match_institutions=pattern_data.get("match_institutions", []),
-                        priority=pattern_data.get("priority", 0),
-                        is_custom=False,
-                    )
-                    self._patterns[rule.id] = rule
+        for rule in DEFAULT_PATTERN_RULES:
+            if rule.id not in self._patterns:
+                self._patterns[rule.id] = copy(rule)
 
-    def _save(self):
-        """Save patterns and history to disk."""
-        # Save patterns
+    @property
+    def revision(self) -> int:
+        """Counter that changes whenever patterns or history change."""
+        return self._revision
+
+    def _changed(self, changed_type: Optional[DocumentType] = None):
+        """Note an in-memory mutation.
+
+        Args:
+            changed_type: Document type whose patterns were modified, if any;
+                only that type's match index is rebuilt
+        """
+        self._revision += 1
+        if changed_type is not None:
+            self._index_by_type.pop(changed_type, None)
+            self._institutions_by_type.pop(changed_type, None)
+            self._best_by_type.pop(changed_type, None)
+
+    def _save(self, changed_type: Optional[DocumentType] = None):
+        """Record a pattern change and write the patterns file immediately."""
+        self._changed(changed_type)
+        self._save_patterns()
+
+    def _save_patterns(self, sync: bool = False):
+        """Write all patterns to disk (fsynced if sync is set)."""
         patterns_data = {
             "version": "1.0",
             "updated_at": datetime.now().isoformat(),
             "patterns": [p.to_dict() for p in self._patterns.values()],
         }
-        with open(self.patterns_file, "w") as f:
-            json.dump(patterns_data, f, indent=2)
+        _write_json(self.patterns_file, patterns_data, sync=sync)
+        self._patterns_dirty = False
+        self._last_flush = time.monotonic()
 
-        # Save history (keep last 1000 entries)
-        history_data = {
-            "version": "1.0",
-            "updated_at": datetime.now().isoformat(),
-            "history": self._history[-1000:],
-        }
-        with open(self.history_file, "w") as f:
-            json.dump(history_data, f, indent=2)
+    def _append_history(self, entries: list[dict]):
+        """Add history entries, appending them to the history log."""
+        self._history.extend(entries)
+
+        with open(self.history_file, "ab") as f:
+            f.write(b"".join(map(_json_line, entries)))
+        self._history_lines += len(entries)
+        self._renames_total += len(entries)
+
+        if self._history_lines > HISTORY_COMPACT_LINES:
+            self._compact_history()
+
+    def _compact_history(self):
+        """Rewrite the history log with only the in-memory entries.
+
+        The number of entries dropped is kept in a leading marker line, so
+        get_stats can still count every rename.
+        """
+        lines = list(map(_json_line, self._history))
+        compacted = self._renames_total - len(self._history)
+        if compacted > 0:
+            lines.insert(0, _json_line({COMPACTED_KEY: compacted}))
+        _atomic_write_bytes(self.history_file, b"".join(lines))
+        self._history_lines = len(self._history)
+
+    def flush(self):
+        """Write deferred pattern usage updates to disk."""
+        if self._patterns_dirty:
+            self._save_patterns()
+
+    def close(self):
+        """Flush pending writes durably; called automatically at interpreter exit."""
+        if self._patterns_dirty:
+            self._save_patterns(sync=True)
 
     def get_all_patterns(self) -> list[PatternRule]:
         """Get all patterns."""
@@ -102,10 +307,44 @@ class PatternStore:
 
     def get_patterns_for_type(self, doc_type: DocumentType) -> list[PatternRule]:
         """Get all patterns for a document type, sorted by priority and usage."""
-        patterns = [p for p in self._patterns.values() if p.document_type == doc_type]
-        # Sort by priority (desc), then use_count (desc)
-        patterns.sort(key=lambda p: (-p.priority, -p.use_count))
-        return patterns
+        return list(self._type_index(doc_type)[0])
+
+    def _type_index(
+        self, doc_type: DocumentType
+    ) -> tuple[list[PatternRule], list[PatternRule], Optional[PatternRule]]:
+        """Return the cached match index for a document type.
+
+        Returns:
+            (patterns, specific, fallback): all patterns for the type in match
+            order, the ones with keyword/institution criteria, and the pattern
+            to use when none of those match. Do not modify the lists.
+        """
+        index = self._index_by_type.get(doc_type)
+        if index is None:
+            patterns = [p for p in self._patterns.values() if p.document_type is doc_type]
+            # Sort by priority (desc), then use_count (desc)
+            patterns.sort(key=lambda p: (-p.priority, -p.use_count))
+
+            specific = [p for p in patterns if p.match_keywords or p.match_institutions]
+            # Most used general pattern, else the top pattern overall
+            fallback = next(
+                (p for p in patterns if not p.match_keywords and not p.match_institutions),
+                patterns[0] if patterns else None,
+            )
+            index = self._index_by_type[doc_type] = (patterns, specific, fallback)
+        return index
+
+    def _institution_index(self, doc_type: DocumentType) -> dict[str, PatternRule]:
+        """Map each lowercased match institution of a type to its first rule."""
+        index = self._institutions_by_type.get(doc_type)
+        if index is None:
+            index = {}
+            for rule in self._patterns.values():
+                if rule.document_type is doc_type:
+                    for name in rule.match_institutions:
+                        index.setdefault(name.lower(), rule)
+            self._institutions_by_type[doc_type] = index
+        return index
 
     def get_best_pattern(self, doc: DocumentInfo) -> Optional[PatternRule]:
         """Get the best matching pattern for a document.
@@ -115,20 +354,23 @@ class PatternStore:
         2. Keyword/institution matches (higher priority patterns)
         3. Usage count (more frequently used patterns preferred)
         """
-        patterns = self.get_patterns_for_type(doc.document_type)
+        # Rules only look at the type, keyword text and institution, so
+        # documents that agree on those share a result
+        best = self._best_by_type.setdefault(doc.document_type, {})
+        key = (doc.match_text, (doc.institution or "").lower())
+        if key in best:
+            return best[key]
 
-        # First, try to find a pattern with specific matches
-        for pattern in patterns:
-            if pattern.match_keywords or pattern.match_institutions:
-                if pattern.matches_document(doc):
-                    return pattern
+        _, specific, fallback = self._type_index(doc.document_type)
 
-        # Fall back to the most used general pattern
-        general_patterns = [p for p in patterns if not p.match_keywords and not p.match_institutions]
-        if general_patterns:
-            return general_patterns[0]
+        # First, try to find a pattern with specific matches, then fall
+        # back to the most used general pattern
+        result = next((p for p in specific if p.matches_document(doc)), fallback)
 
-        return patterns[0] if patterns else None
+        if len(best) >= BEST_PATTERN_CACHE_SIZE:
+            best.clear()
+        best[key] = result
+        return result
 
     def get_pattern_by_id(self, pattern_id: str) -> Optional[PatternRule]:
         """Get a specific pattern by ID."""
@@ -161,7 +403,7 @@ class PatternStore:
             is_custom=True,
         )
         self._patterns[rule.id] = rule
-        self._save()
+        self._save(rule.document_type)
         return rule
 
     def update_pattern(
@@ -196,7 +438,7 @@ class PatternStore:
         if priority is not None:
             rule.priority = priority
 
-        self._save()
+        self._save(rule.document_type)
         return rule
 
     def delete_pattern(self, pattern_id: str) -> bool:
@@ -214,7 +456,7 @@ class PatternStore:
             return False
 
         del self._patterns[pattern_id]
-        self._save()
+        self._save(rule.document_type)
         return True
 
     def record_usage(self, pattern_id: str, doc: DocumentInfo, new_name: str):
@@ -222,22 +464,55 @@ class PatternStore:
 
         This increases the pattern's use count and records the rename in history.
         """
-        rule = self._patterns.get(pattern_id)
-        if rule:
-            rule.use_count += 1
-            rule.last_used = datetime.now().isoformat()
+        self._record_usages(((pattern_id, doc, new_name),))
+
+        # Usage counts only affect ordering, so during a batch the patterns
+        # file is rewritten at most once per PATTERN_FLUSH_INTERVAL
+        if self._patterns_dirty and time.monotonic() - self._last_flush >= PATTERN_FLUSH_INTERVAL:
+            self._save_patterns()
+
+    def record_usage_bulk(self, events: Iterable[tuple[str, DocumentInfo, str]]):
+        """Record several pattern uses at once, e.g. at the end of a batch.
+
+        History is appended in one write and the patterns file is saved once.
+
+        Args:
+            events: (pattern_id, doc, new_name) tuples, as passed to record_usage
+        """
+        self._record_usages(events)
+        self.flush()
+
+    def _record_usages(self, events: Iterable[tuple[str, DocumentInfo, str]]):
+        """Update use counts and history for pattern uses, deferring the patterns file."""
+        now = datetime.now().isoformat()
+        entries = []
+        changed_types = set()
+
+        for pattern_id, doc, new_name in events:
+            rule = self._patterns.get(pattern_id)
+            if rule:
+                rule.use_count += 1
+                rule.last_used = now
+                self._patterns_dirty = True
+
+            entries.append({
+                "timestamp": now,
+                "pattern_id": pattern_id,
+                "document_type": doc.document_type.value,
+                "original_name": doc.original_name,
+                "new_name": new_name,
+                "institution": doc.institution,
+            })
+            changed_types.add(rule.document_type if rule else None)
+
+        if not entries:
+            return
 
         # Record in history
-        self._history.append({
-            "timestamp": datetime.now().isoformat(),
-            "pattern_id": pattern_id,
-            "document_type": doc.document_type.value,
-            "original_name": doc.original_name,
-            "new_name": new_name,
-            "institution": doc.institution,
-        })
+        self._append_history(entries)
 
-        self._save()
+        for changed_type in changed_types:
+            self._changed(changed_type)
 
     def learn_from_batch(
         self,
@@ -255,15 +530,14 @@ class PatternStore:
         """
         # Check if we already have a pattern for this institution
         if institution:
-            for rule in self._patterns.values():
-                if (rule.document_type == doc_type and
-                    institution.lower() in [i.lower() for i in rule.match_institutions]):
-                    # Update existing pattern
-                    rule.pattern = pattern
-                    rule.use_count += 1
-                    rule.last_used = datetime.now().isoformat()
-                    self._save()
-                    return rule
+            rule = self._institution_index(doc_type).get(institution.lower())
+            if rule:
+                # Update existing pattern
+                rule.pattern = pattern
+                rule.use_count += 1
+                rule.last_used = datetime.now().isoformat()
+                self._save(doc_type)
+                return rule
 
         # Create new pattern
         return self.add_pattern(
@@ -275,22 +549,38 @@ class PatternStore:
         )
 
     def get_history(self, limit: int = 50) -> list[dict]:
-        """Get recent rename history."""
-        return self._history[-limit:][::-1]  # Most recent first
+        """Get recent rename history, most recent first.
+
+        Args:
+            limit: Maximum number of entries to return; 0 (or less) returns
+                all of the history kept
+        """
+        if limit <= 0:
+            return list(reversed(self._history))
+        # Walk back from the newest entry, touching only the entries returned
+        return list(islice(reversed(self._history), limit))
+
+    def _history_total(self) -> int:
+        """Count every rename logged, not just the entries kept in memory."""
+        self._history  # Loads the log, which sets the count
+        return self._renames_total
 
     def get_stats(self) -> dict:
         """Get statistics about pattern usage."""
-        type_counts = {}
+        # One pass over the patterns; counts are keyed by enum member so
+        # .value is only read once per type
+        type_counts = defaultdict(lambda: {"patterns": 0, "uses": 0})
+        custom_count = 0
         for rule in self._patterns.values():
-            doc_type = rule.document_type.value
-            if doc_type not in type_counts:
-                type_counts[doc_type] = {"patterns": 0, "uses": 0}
-            type_counts[doc_type]["patterns"] += 1
-            type_counts[doc_type]["uses"] += rule.use_count
+            counts = type_counts[rule.document_type]
+            counts["patterns"] += 1
+            counts["uses"] += rule.use_count
+            if rule.is_custom:
+                custom_count += 1
 
         return {
             "total_patterns": len(self._patterns),
-            "custom_patterns": sum(1 for p in self._patterns.values() if p.is_custom),
-            "total_renames": len(self._history),
-            "by_type": type_counts,
+            "custom_patterns": custom_count,
+            "total_renames": self._history_total(),
+            "by_type": {doc_type.value: counts for doc_type, counts in type_counts.items()},
         }
@@ -1,17 +1,49 @@
 """File analysis tools for the rename agent."""
 
-import base64
+import codecs
+import importlib.util
+import io
 import mimetypes
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
-# Try to import optional dependencies
+# Try to import optional dependencies. PyMuPDF is slow to import, so it is
+# only located here and loaded by _load_fitz() the first time a PDF is read.
+HAS_PYMUPDF = importlib.util.find_spec("fitz") is not None
+_fitz = None
+
+# PyMuPDF is not thread-safe; serialize document access across threads
+_FITZ_LOCK = threading.Lock()
+
+# Text from the first pages of a PDF that is enough to name it; later
+# pages are not read once this much has been extracted
+PDF_EARLY_EXIT_CHARS = 4000
+
+# First-page renders of PDFs: resolution, longest edge in pixels (so
+# oversized pages render at a lower DPI) and JPEG quality
+PDF_RENDER_DPI = 100
+PDF_RENDER_MAX_SIZE = 1568
+PDF_JPEG_QUALITY = 80
+
+# Images resized to at most this size use bilinear rather than Lanczos
+# resampling, which is cheaper and indistinguishable at thumbnail sizes
+BILINEAR_MAX_SIZE = 256
+
+# Listings at least this long stat/sniff their files on a thread pool
+LIST_PARALLEL_THRESHOLD = 32
+MAX_LIST_WORKERS = 32
+
+# pybase64 has a SIMD codec; its b64encode is a drop-in for the stdlib's
 try:
-    import fitz  # PyMuPDF
-    HAS_PYMUPDF = True
+    import pybase64 as _b64
+    HAS_PYBASE64 = True
 except ImportError:
-    HAS_PYMUPDF = False
+    import base64 as _b64
+    HAS_PYBASE64 = False
 
 try:
     from PIL import Image
@@ -26,6 +58,22 @@ except ImportError:
     HAS_MAGIC = False
 
 
+def _load_fitz():
+    """Import PyMuPDF on first use.
+
+    Returns:
+        The fitz module, or None if PyMuPDF is unavailable
+    """
+    global _fitz, HAS_PYMUPDF
+    if _fitz is None and HAS_PYMUPDF:
+        try:
+            import fitz  # PyMuPDF
+            _fitz = fitz
+        except ImportError:
+            HAS_PYMUPDF = False
+    return _fitz
+
+
 def get_mime_type(file_path: str) -> str:
     """Get the MIME type of a file."""
     if HAS_MAGIC:
@@ -53,93 +101,221 @@ def get_file_info(file_path: str) -> dict[str, Any]:
     """
     path = Path(file_path)
 
-    if not path.exists():
+    try:
+        st = path.stat()
+    except (FileNotFoundError, NotADirectoryError):
         return {"error": f"File not found: {file_path}"}
 
-    mime_type = get_mime_type(file_path)
+    return _build_file_info(str(path.absolute()), path.name, st)
+
+
+def _build_file_info(
+    abs_path: str,
+    name: str,
+    st: os.stat_result,
+    detect_mime: bool = True,
+) -> dict[str, Any]:
+    """Build the get_file_info dict from an existing file's stat result.
+
+    Args:
+        abs_path: Absolute path to the file
+        name: The file's name (last path component)
+        st: Result of stat() on the file
+        detect_mime: Sniff the file's contents for its MIME type. When False,
+            the type is guessed from the extension and the file is only
+            opened if the extension is unknown.
+    """
+    mime_type = None if detect_mime else mimetypes.guess_type(name)[0]
+    if mime_type is None:
+        mime_type = get_mime_type(abs_path)
+    extension = _suffix(name).lower()
 
     return {
-        "name": path.name,
-        "path": str(path.absolute()),
-        "size": path.stat().st_size,
-        "extension": path.suffix.lower(),
+        "name": name,
+        "path": abs_path,
+        "size": st.st_size,
+        "extension": extension,
         "mime_type": mime_type,
-        "is_pdf": mime_type == "application/pdf" or path.suffix.lower() == ".pdf",
+        "is_pdf": mime_type == "application/pdf" or extension == ".pdf",
         "is_image": mime_type.startswith("image/") if mime_type else False,
     }
 
 
-def extract_pdf_text(file_path: str, max_pages: int = 3, max_chars: int = 30000) -> str:
+def extract_pdf_text(
+    file_path: str,
+    max_pages: int = 3,
+    max_chars: int = 30000,
+    early_exit_chars: int = PDF_EARLY_EXIT_CHARS,
+) -> str:
     """Extract text from a PDF file.
 
     Args:
         file_path: Path to PDF file
         max_pages: Maximum number of pages to extract (3 is sufficient for renaming)
         max_chars: Maximum characters to return (default 30KB)
+        early_exit_chars: Stop reading further pages once this many
+            characters have been extracted
 
     Returns:
         Extracted text content
     """
-    if not HAS_PYMUPDF:
+    fitz = _load_fitz()
+    if fitz is None:
         return "[PDF text extraction requires PyMuPDF. Install with: pip install pymupdf]"
 
     try:
-        doc = fitz.open(file_path)
-        text_parts = []
-        total_chars = 0
-        pages_shown = 0
-
-        for page_num in range(min(len(doc), max_pages)):
-            page = doc[page_num]
-            page_text = page.get_text()
-
-            # Check if we're exceeding the character limit
-            if total_chars + len(page_text) > max_chars:
-                remaining = max_chars - total_chars
-                if remaining > 100:
-                    text_parts.append(f"--- Page {page_num + 1} ---\n{page_text[:remaining]}\n[...truncated...]")
-                    pages_shown += 1
-                break
-
-            text_parts.append(f"--- Page {page_num + 1} ---\n{page_text}")
-            total_chars += len(page_text)
-            pages_shown += 1
-
-        total_pages = len(doc)
-        doc.close()
-
-        if total_pages > pages_shown:
-            text_parts.append(f"\n[Document has {total_pages} pages, showing first {pages_shown}]")
-
-        return "\n\n".join(text_parts)
+        with _FITZ_LOCK, fitz.open(file_path) as doc:
+            return _pdf_text(doc, max_pages, max_chars, early_exit_chars)
     except Exception as e:
         return f"[Error extracting PDF text: {e}]"
 
 
-def extract_pdf_first_page_image(file_path: str) -> Optional[bytes]:
+def _pdf_text(
+    doc,
+    max_pages: int,
+    max_chars: int,
+    early_exit_chars: int = PDF_EARLY_EXIT_CHARS,
+) -> str:
+    """Extract text from the first pages of an open PDF document.
+
+    Args:
+        doc: An open fitz.Document (the caller holds _FITZ_LOCK)
+        max_pages: Maximum number of pages to extract
+        max_chars: Maximum characters to return
+        early_exit_chars: Stop reading further pages once this many
+            characters have been extracted
+
+    Returns:
+        Extracted text content
+    """
+    # Pages are written straight into one buffer, separated by blank lines
+    buf = io.StringIO()
+    write = buf.write
+    total_chars = 0
+    pages_shown = 0
+
+    for page_num in range(min(len(doc), max_pages)):
+        # Pages without text (e.g. scans) don't count, so the next is tried
+        if total_chars >= early_exit_chars:
+            break
+
+        page_text = doc[page_num].get_text()
+        n = len(page_text)
+
+        # Check if we're exceeding the character limit
+        if total_chars + n > max_chars:
+            remaining = max_chars - total_chars
+            if remaining > 100:
+                if pages_shown:
+                    write("\n\n")
+                write(f"--- Page {page_num + 1} ---\n")
+                write(page_text[:remaining])
+                write("\n[...truncated...]")
+                pages_shown += 1
+            break
+
+        if pages_shown:
+            write("\n\n")
+        write(f"--- Page {page_num + 1} ---\n")
+        write(page_text)
+        total_chars += n
+        pages_shown += 1
+
+    total_pages = len(doc)
+    if total_pages > pages_shown:
+        if pages_shown:
+            write("\n\n")
+        write(f"\n[Document has {total_pages} pages, showing first {pages_shown}]")
+
+    return buf.getvalue()
+
+
+def extract_pdf_first_page_image(
+    file_path: str,
+    dpi: int = PDF_RENDER_DPI,
+    grayscale: bool = True,
+) -> Optional[bytes]:
     """Extract the first page of a PDF as an image.
 
+    Args:
+        file_path: Path to PDF file
+        dpi: Render resolution (lowered for pages too large to fit
+            PDF_RENDER_MAX_SIZE)
+        grayscale: Render in grayscale rather than RGB
+
     Returns:
-        PNG image bytes, or None if extraction fails
+        JPEG image bytes, or None if extraction fails
     """
-    if not HAS_PYMUPDF:
+    fitz = _load_fitz()
+    if fitz is None:
         return None
 
     try:
-        doc = fitz.open(file_path)
-        page = doc[0]
-
-        # Render at 150 DPI for good quality without huge size
-        mat = fitz.Matrix(150 / 72, 150 / 72)
-        pix = page.get_pixmap(matrix=mat)
-
-        img_bytes = pix.tobytes("png")
-        doc.close()
-        return img_bytes
+        with _FITZ_LOCK, fitz.open(file_path) as doc:
+            return _pdf_first_page_image(fitz, doc, dpi, grayscale)
     except Exception:
         return None
 
 
+def _pdf_first_page_image(
+    fitz,
+    doc,
+    dpi: int = PDF_RENDER_DPI,
+    grayscale: bool = True,
+) -> bytes:
+    """Render the first page of an open PDF document.
+
+    Args:
+        fitz: The PyMuPDF module
+        doc: An open fitz.Document (the caller holds _FITZ_LOCK)
+        dpi: Render resolution (lowered for pages too large to fit
+            PDF_RENDER_MAX_SIZE)
+        grayscale: Render in grayscale rather than RGB
+
+    Returns:
+        JPEG image bytes
+    """
+    page = doc[0]
+
+    # Most documents read fine at 100 DPI; fewer pixels and channels keep
+    # both rendering and encoding cheap
+    rect = page.rect
+    zoom = min(dpi / 72, PDF_RENDER_MAX_SIZE / max(rect.width, rect.height, 1))
+    pix = page.get_pixmap(
+        matrix=fitz.Matrix(zoom, zoom),
+        colorspace=fitz.csGRAY if grayscale else fitz.csRGB,
+        alpha=False,
+    )
+
+    return pix.tobytes("jpeg", jpg_quality=PDF_JPEG_QUALITY)
+
+
+def _analyze_pdf(file_path: str, max_chars: int, want_image: bool) -> tuple[str, Optional[bytes]]:
+    """Extract text and, optionally, a first-page image from one PDF open.
+
+    Opening a PDF parses its cross-reference table and loads its fonts, so
+    analysis shares one document between the text and image passes.
+
+    Returns:
+        Tuple of (text content, JPEG image bytes or None)
+    """
+    fitz = _load_fitz()
+    if fitz is None:
+        return extract_pdf_text(file_path, max_chars=max_chars), None
+
+    try:
+        with _FITZ_LOCK, fitz.open(file_path) as doc:
+            text = _pdf_text(doc, 3, max_chars)
+            if not want_image:
+                return text, None
+            try:
+                return text, _pdf_first_page_image(fitz, doc)
+            except Exception:
+                return text, None
+    except Exception as e:
+        return f"[Error extracting PDF text: {e}]", None
+
+
 def get_image_base64(file_path: str, max_size: int = 1024) -> Optional[str]:
     """Get base64-encoded image, resizing if needed.
 
@@ -154,35 +330,60 @@ def get_image_base64(file_path: str, max_size: int = 1024) -> Optional[str]:
         # Just read the file directly
         try:
             with open(file_path, "rb") as f:
-                return base64.b64encode(f.read()).decode("utf-8")
+                return _b64.b64encode(f.read()).decode("utf-8")
         except Exception:
             return None
 
     try:
         img = Image.open(file_path)
 
+        # A JPEG that is already small enough is sent as-is; opening only
+        # read its header, so it is never decoded or re-encoded
+        if img.format == "JPEG" and img.mode in ("RGB", "L") and max(img.size) <= max_size:
+            img.close()
+            with open(file_path, "rb") as f:
+                return _b64.b64encode(f.read()).decode("utf-8")
+
+        # Let libjpeg decode large JPEGs at a reduced scale (1/2, 1/4 or
+        # 1/8) that still covers max_size, instead of decoding full size
+        if img.format == "JPEG":
+            img.draft("RGB", (max_size, max_size))
+
         # Resize if needed
         if max(img.size) > max_size:
             ratio = max_size / max(img.size)
             new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
+            if max_size <= BILINEAR_MAX_SIZE:
+                resample = Image.Resampling.BILINEAR
+            else:
+                resample = Image.Resampling.LANCZOS
+            img = img.resize(new_size, resample)
 
         # Convert to RGB if necessary (for PNG with transparency)
         if img.mode in ("RGBA", "P"):
             img = img.convert("RGB")
 
         # Save to bytes
-        import io
         buffer = io.BytesIO()
         img.save(buffer, format="JPEG", quality=85)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return _b64.b64encode(buffer.getvalue()).decode("utf-8")
     except Exception:
         return None
 
 
-def analyze_file(file_path: str) -> dict[str, Any]:
+def analyze_file(
+    file_path: str,
+    max_text_chars: int = 30000,
+    max_image_file_size: Optional[int] = None,
+) -> dict[str, Any]:
     """Analyze a file and extract content for AI processing.
 
+    Args:
+        file_path: Path to the file to analyze
+        max_text_chars: Maximum characters of text content to extract
+        max_image_file_size: Skip image rendering/encoding for files of at
+            least this many bytes (None for no limit)
+
     Returns a dict with:
         - file_info: basic file information
         - content_type: "text", "pdf", "image", or "binary"
@@ -203,30 +404,30 @@ def analyze_file(file_path: str) -> dict[str, Any]:
         "analysis_ready": False,
     }
 
+    want_image = max_image_file_size is None or file_info["size"] < max_image_file_size
+
     # Handle PDFs
     if file_info["is_pdf"]:
         result["content_type"] = "pdf"
-        result["text_content"] = extract_pdf_text(file_path)
-
         # Also get first page as image for visual analysis
-        img_bytes = extract_pdf_first_page_image(file_path)
+        result["text_content"], img_bytes = _analyze_pdf(file_path, max_text_chars, want_image)
         if img_bytes:
-            result["image_base64"] = base64.b64encode(img_bytes).decode("utf-8")
+            result["image_base64"] = _b64.b64encode(img_bytes).decode("utf-8")
 
         result["analysis_ready"] = True
 
     # Handle images
     elif file_info["is_image"]:
         result["content_type"] = "image"
-        result["image_base64"] = get_image_base64(file_path)
+        if want_image:
+            result["image_base64"] = get_image_base64(file_path)
         result["analysis_ready"] = result["image_base64"] is not None
 
     # Handle text files
     elif file_info["mime_type"] and file_info["mime_type"].startswith("text/"):
         result["content_type"] = "text"
         try:
-            with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-                result["text_content"] = f.read(10000)  # First 10KB
+            result["text_content"] = _read_text_head(file_path, min(10000, max_text_chars))  # First 10KB
             result["analysis_ready"] = True
         except Exception as e:
             result["text_content"] = f"[Error reading file: {e}]"
@@ -234,6 +435,25 @@ def analyze_file(file_path: str) -> dict[str, Any]:
     return result
 
 
+def _read_text_head(file_path: str, max_bytes: int) -> str:
+    """Read the start of a UTF-8 text file with a single read call.
+
+    Matches reading in text mode: invalid bytes are replaced and newlines
+    are translated to "\\n". A character cut off by the size limit is dropped.
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        raw = os.read(fd, max_bytes)
+    finally:
+        os.close(fd)
+
+    # A non-final incremental decode holds back a trailing partial character
+    text = codecs.getincrementaldecoder("utf-8")("replace").decode(raw)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
 def get_file_content(file_path: str) -> dict[str, Any]:
     """Get file content suitable for Claude analysis.
 
@@ -255,17 +475,72 @@ def get_file_content(file_path: str) -> dict[str, Any]:
     }
 
 
+def _suffix(name: str) -> str:
+    """Return the extension of a filename, matching ``Path.suffix``."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ""
+
+
+def _iter_file_entries(directory: str, recursive: bool):
+    """Yield ``os.DirEntry`` objects for the files under a directory.
+
+    Uses ``os.scandir`` so file-type checks come from the directory listing
+    instead of an extra ``stat`` per entry. Like ``Path.glob("**/*")``,
+    symlinked directories are not descended into and unreadable
+    subdirectories are skipped.
+    """
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    try:
+                        if entry.is_file():
+                            yield entry
+                        elif recursive and entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _entry_info(entry: os.DirEntry, detect_mime: bool = False) -> Optional[dict[str, Any]]:
+    """Build the file info dict for an absolute-path directory entry.
+
+    Args:
+        entry: Directory entry for the file
+        detect_mime: Sniff the file's contents for its MIME type
+
+    Returns:
+        The file info dict, or None if the file vanished
+    """
+    try:
+        # DirEntry caches its stat result, so each file is stat'ed once
+        st = entry.stat()
+    except OSError:
+        return None
+
+    return _build_file_info(entry.path, entry.name, st, detect_mime)
+
+
 def list_files_in_directory(
     directory: str,
-    extensions: Optional[list[str]] = None,
+    extensions: Optional[Sequence[str]] = None,
     recursive: bool = False,
+    detect_mime: bool = False,
 ) -> list[dict[str, Any]]:
     """List files in a directory with optional filtering.
 
     Args:
         directory: Directory path to scan
-        extensions: Optional list of extensions to filter (e.g., [".pdf", ".jpg"])
+        extensions: Optional extensions to filter by, case-insensitive (e.g., [".pdf", ".jpg"])
         recursive: Whether to scan subdirectories
+        detect_mime: Sniff every file's contents for its MIME type. By
+            default the type comes from the extension, and only files with
+            an unknown extension are opened.
 
     Returns:
         List of file info dicts
@@ -278,17 +553,24 @@ def list_files_in_directory(
     if not path.is_dir():
         return [{"error": f"Not a directory: {directory}"}]
 
-    files = []
-    pattern = "**/*" if recursive else "*"
-
-    for file_path in path.glob(pattern):
-        if file_path.is_file():
-            # Filter by extension if specified
-            if extensions:
-                if file_path.suffix.lower() not in [e.lower() for e in extensions]:
-                    continue
-
-            files.append(get_file_info(str(file_path)))
+    wanted = frozenset(e.lower() for e in extensions) if extensions else None
+    # Scanning from the absolute directory makes every DirEntry.path absolute
+    entries = [
+        entry for entry in _iter_file_entries(str(path.absolute()), recursive)
+        # Filter by extension if specified
+        if wanted is None or _suffix(entry.name).lower() in wanted
+    ]
+
+    # stat() and MIME sniffing are blocking I/O, so large listings (e.g. on
+    # network drives) overlap them on a thread pool
+    flags = repeat(detect_mime, len(entries))
+    if len(entries) >= LIST_PARALLEL_THRESHOLD:
+        with ThreadPoolExecutor(max_workers=min(MAX_LIST_WORKERS, len(entries))) as pool:
+            infos = list(pool.map(_entry_info, entries, flags))
+    else:
+        infos = map(_entry_info, entries, flags)
+
+    files = [info for info in infos if info is not None]
 
     # Sort by name
     files.sort(key=lambda f: f.get("name", ""))
@@ -1,7 +1,12 @@
 """File renaming tools for the rename agent."""
 
+import errno
 import os
+import re
 import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Optional
 
@@ -9,6 +14,26 @@ from ..models.document import DocumentType, DocumentInfo, RenameResult, PatternR
 from ..patterns.pattern_store import PatternStore
 from .pattern_manager import get_store
 
+# Characters not allowed in filenames (Windows is most restrictive),
+# mapped to dashes by sanitize_filename
+_INVALID_CHARS_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '-'))
+
+# Whitespace/dash normalization applied by sanitize_filename
+_WHITESPACE_RE = re.compile(r'\s+')
+_DASH_RUN_RE = re.compile(r'-+')
+_DASH_SPACING_RE = re.compile(r'\s*-\s*')
+
+# Numbered names get_unique_path checks one by one before listing the
+# directory to skip past existing copies
+UNIQUE_PROBE_LIMIT = 3
+
+# Directories a batch rename works on at once
+DEFAULT_BATCH_WORKERS = min(8, os.cpu_count() or 1)
+
+# The pattern store is not thread-safe; renames applied from different
+# threads record usage in turn
+_RECORD_LOCK = threading.Lock()
+
 
 def sanitize_filename(name: str) -> str:
     """Sanitize a filename by removing/replacing invalid characters.
@@ -19,21 +44,13 @@ def sanitize_filename(name: str) -> str:
     Returns:
         A valid filename
     """
-    # Characters not allowed in filenames (Windows is most restrictive)
-    invalid_chars = '<>:"/\\|?*'
-
-    result = name
-    for char in invalid_chars:
-        result = result.replace(char, '-')
-
-    # Remove leading/trailing whitespace and dots
-    result = result.strip().strip('.')
+    # Replace invalid characters, then remove leading/trailing whitespace and dots
+    result = name.translate(_INVALID_CHARS_TABLE).strip().strip('.')
 
     # Collapse multiple spaces/dashes
-    import re
-    result = re.sub(r'\s+', ' ', result)
-    result = re.sub(r'-+', '-', result)
-    result = re.sub(r'\s*-\s*', ' - ', result)
+    result = _WHITESPACE_RE.sub(' ', result)
+    result = _DASH_RUN_RE.sub('-', result)
+    result = _DASH_SPACING_RE.sub(' - ', result)
 
     # Ensure the filename isn't empty
     if not result:
@@ -58,14 +75,27 @@ def get_unique_path(file_path: Path) -> Path:
     ext = file_path.suffix
     parent = file_path.parent
 
-    counter = 1
-    while True:
-        new_path = parent / f"{base} ({counter}){ext}"
+    # Names known to be taken once the directory has been listed
+    taken: Optional[set[str]] = None
+
+    for counter in range(1, 1001):  # Safety limit
+        name = f"{base} ({counter}){ext}"
+        if taken is None and counter > UNIQUE_PROBE_LIMIT:
+            # Many numbered copies exist; list the directory once rather
+            # than stat'ing every candidate
+            try:
+                taken = set(os.listdir(parent))
+            except OSError:
+                taken = set()
+        if taken is not None and name in taken:
+            continue
+        # Confirm with the file system, which may ignore case or
+        # normalization differences that the listing doesn't
+        new_path = parent / name
         if not new_path.exists():
             return new_path
-        counter += 1
-        if counter > 1000:  # Safety limit
-            raise ValueError("Could not find unique filename")
+
+    raise ValueError("Could not find unique filename")
 
 
 def preview_rename(
@@ -80,6 +110,35 @@ def preview_rename(
         new_name: The new filename (without extension)
         destination_dir: Optional destination directory (moves file if specified)
 
+    Returns:
+        Preview dict with original and new paths
+    """
+    if destination_dir:
+        dest_path = Path(destination_dir)
+        if not dest_path.exists():
+            if not Path(file_path).exists():
+                return {"error": f"File not found: {file_path}"}
+            return {"error": f"Destination directory not found: {destination_dir}"}
+    else:
+        dest_path = None
+
+    return _build_preview(file_path, new_name, destination_dir, dest_path)
+
+
+def _build_preview(
+    file_path: str,
+    new_name: str,
+    destination_dir: Optional[str],
+    dest_path: Optional[Path],
+) -> dict[str, Any]:
+    """Build a rename preview for a destination already known to exist.
+
+    Args:
+        file_path: Path to the file to rename
+        new_name: The new filename (without extension)
+        destination_dir: Destination as requested by the caller
+        dest_path: Validated destination directory, or None for the source's own
+
     Returns:
         Preview dict with original and new paths
     """
@@ -96,13 +155,7 @@ def preview_rename(
     new_filename = f"{clean_name}{ext}"
 
     # Determine destination
-    if destination_dir:
-        dest_path = Path(destination_dir)
-        if not dest_path.exists():
-            return {"error": f"Destination directory not found: {destination_dir}"}
-        new_path = dest_path / new_filename
-    else:
-        new_path = source.parent / new_filename
+    new_path = (dest_path or source.parent) / new_filename
 
     # Check for conflicts
     unique_path = get_unique_path(new_path)
@@ -125,6 +178,7 @@ def apply_rename(
     destination_dir: Optional[str] = None,
     pattern_id: Optional[str] = None,
     document_type: Optional[str] = None,
+    store: Optional[PatternStore] = None,
 ) -> dict[str, Any]:
     """Apply a rename operation.
 
@@ -134,12 +188,138 @@ def apply_rename(
         destination_dir: Optional destination directory (moves file if specified)
         pattern_id: Optional pattern ID to record usage
         document_type: Optional document type for history
+        store: Pattern store to record usage in (defaults to the global store)
 
     Returns:
         Result dict with success status and paths
     """
     preview = preview_rename(file_path, new_name, destination_dir)
 
+    return _apply_preview(file_path, preview, pattern_id, document_type, store)
+
+
+# Errors from the no-replace rename meaning "can't do it this way here"
+# (another file system, or the call or flag is unsupported), as opposed
+# to real failures
+_NOREPLACE_FALLBACK_ERRNOS = frozenset(
+    code for code in (
+        getattr(errno, name, None)
+        for name in ("EXDEV", "EPERM", "ENOTSUP", "EOPNOTSUPP", "EINVAL", "ENOSYS")
+    )
+    if code is not None
+)
+
+# renameat2()/renamex_np() flags that refuse to replace an existing file
+_RENAME_NOREPLACE = 1  # Linux RENAME_NOREPLACE
+_RENAME_EXCL = 0x4  # macOS RENAME_EXCL
+_AT_FDCWD = -100  # Linux AT_FDCWD
+
+_noreplace_rename_fn = None
+_noreplace_rename_loaded = False
+
+
+def _load_noreplace_rename():
+    """Look up this platform's atomic no-replace rename on first use.
+
+    Returns:
+        A rename(src, dst) function raising OSError on failure, or None if
+        the C library doesn't provide one
+    """
+    global _noreplace_rename_fn, _noreplace_rename_loaded
+    if _noreplace_rename_loaded:
+        return _noreplace_rename_fn
+    _noreplace_rename_loaded = True
+
+    if sys.platform.startswith("linux"):
+        name = "renameat2"
+    elif sys.platform == "darwin":
+        name = "renamex_np"
+    else:
+        return None
+
+    try:
+        import ctypes
+        func = getattr(ctypes.CDLL(None, use_errno=True), name)
+    except (ImportError, OSError, AttributeError):
+        return None
+
+    if name == "renameat2":
+        func.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint)
+
+        def call(src: bytes, dst: bytes) -> int:
+            return func(_AT_FDCWD, src, _AT_FDCWD, dst, _RENAME_NOREPLACE)
+    else:
+        func.argtypes = (ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint)
+
+        def call(src: bytes, dst: bytes) -> int:
+            return func(src, dst, _RENAME_EXCL)
+
+    def rename(src: Path, dst: Path):
+        if call(os.fsencode(src), os.fsencode(dst)) != 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), str(src), None, str(dst))
+
+    _noreplace_rename_fn = rename
+    return rename
+
+
+def _move_without_replacing(source: Path, dest: Path):
+    """Move a file, failing instead of replacing a file at the destination.
+
+    A file may appear at the destination after the preview chose it, so the
+    move itself must not overwrite. On Linux and macOS a same-file-system
+    move is one rename that the kernel refuses if the destination exists.
+    On Windows os.rename never overwrites. Otherwise (across file systems,
+    or where the no-replace rename is unsupported) the destination is
+    checked immediately before an os.rename, or shutil.move to copy across
+    file systems; that check can't exclude a file created in between.
+
+    Raises:
+        FileExistsError: If something already exists at dest
+    """
+    rename = _load_noreplace_rename()
+    if rename is not None:
+        try:
+            rename(source, dest)
+            return
+        except FileExistsError:
+            raise FileExistsError(f"Destination already exists: {dest}") from None
+        except OSError as e:
+            if e.errno not in _NOREPLACE_FALLBACK_ERRNOS:
+                raise
+
+    if os.path.lexists(dest):
+        raise FileExistsError(f"Destination already exists: {dest}")
+    try:
+        os.rename(source, dest)
+    except FileExistsError:
+        # Windows: os.rename refuses to replace an existing file
+        raise FileExistsError(f"Destination already exists: {dest}") from None
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(source), str(dest))
+
+
+def _apply_preview(
+    file_path: str,
+    preview: dict[str, Any],
+    pattern_id: Optional[str],
+    document_type: Optional[str],
+    store: Optional[PatternStore] = None,
+) -> dict[str, Any]:
+    """Execute a rename previously planned by a preview.
+
+    Args:
+        file_path: Path to the file to rename
+        preview: Preview dict for the file (returned as-is if it holds an error)
+        pattern_id: Optional pattern ID to record usage
+        document_type: Optional document type for history
+        store: Pattern store to record usage in (defaults to the global store)
+
+    Returns:
+        Result dict with success status and paths
+    """
     if "error" in preview:
         return preview
 
@@ -147,22 +327,21 @@ def apply_rename(
     dest = Path(preview["new_path"])
 
     try:
-        # Create destination directory if needed
-        dest.parent.mkdir(parents=True, exist_ok=True)
-
-        # Perform the rename/move
-        shutil.move(str(source), str(dest))
+        # The preview already verified the destination directory exists
+        _move_without_replacing(source, dest)
 
         # Record pattern usage if specified
         if pattern_id:
-            store = get_store()
+            if store is None:
+                store = get_store()
             doc_type = DocumentType.from_string(document_type or "general")
             doc = DocumentInfo(
                 file_path=file_path,
                 original_name=source.name,
                 document_type=doc_type,
             )
-            store.record_usage(pattern_id, doc, dest.name)
+            with _RECORD_LOCK:
+                store.record_usage(pattern_id, doc, dest.name)
 
         return {
             "success": True,
@@ -181,71 +360,140 @@ def apply_rename(
         }
 
 
+def _directory_key(directory: str) -> str:
+    """Identify a directory for grouping batch renames.
+
+    Symlinks are resolved and case is folded, so every spelling of one real
+    directory maps to the same group. Folding case on a case-sensitive file
+    system can only merge groups, which runs them in order and stays safe.
+    """
+    return os.path.normcase(os.path.realpath(directory)).casefold()
+
+
 def apply_batch_rename(
     renames: list[dict[str, Any]],
     destination_dir: Optional[str] = None,
     pattern_id: Optional[str] = None,
     document_type: Optional[str] = None,
     dry_run: bool = False,
+    max_workers: int = DEFAULT_BATCH_WORKERS,
 ) -> dict[str, Any]:
     """Apply multiple rename operations.
 
+    Renames into different directories run concurrently; renames into the
+    same directory run in order, so conflict resolution sees earlier moves.
+
     Args:
         renames: List of dicts with 'file_path' and 'new_name' keys
         destination_dir: Optional shared destination directory
         pattern_id: Optional pattern ID to record usage for all
         document_type: Optional document type for history
         dry_run: If True, only preview without executing
+        max_workers: Maximum number of directories worked on at once
 
     Returns:
         Results dict with success count, failures, and details
     """
-    results = []
-    success_count = 0
-    failure_count = 0
+    results: list[Optional[dict[str, Any]]] = [None] * len(renames)
+    # Looked up once for the whole batch rather than per recorded rename
+    store = get_store() if pattern_id and not dry_run else None
+    # Indexes of the renames into each destination directory
+    groups: dict[str, list[int]] = {}
 
-    for rename in renames:
+    for i, rename in enumerate(renames):
         file_path = rename.get("file_path")
         new_name = rename.get("new_name")
 
         if not file_path or not new_name:
-            results.append({
+            results[i] = {
                 "success": False,
                 "error": "Missing file_path or new_name",
                 "original": rename,
-            })
-            failure_count += 1
+            }
             continue
 
         # Use per-file destination if specified, otherwise use shared
         dest = rename.get("destination_dir", destination_dir)
+        try:
+            key = _directory_key(dest or os.path.dirname(os.path.abspath(file_path)))
+        except (TypeError, ValueError) as e:
+            results[i] = {
+                "success": False,
+                "error": str(e),
+                "original_path": str(file_path),
+            }
+            continue
+        groups.setdefault(key, []).append(i)
+
+    def run_group(indexes: list[int]) -> None:
+        # Destination directories that exist, each checked once per group
+        valid_dests: dict[str, Path] = {}
+
+        for i in indexes:
+            rename = renames[i]
+            file_path = rename["file_path"]
+            new_name = rename["new_name"]
+            dest = rename.get("destination_dir", destination_dir)
+
+            # A bad entry fails on its own; raising would lose the results
+            # (and usage records) of renames other groups already made
+            try:
+                if dest and dest in valid_dests:
+                    preview = _build_preview(file_path, new_name, dest, valid_dests[dest])
+                else:
+                    preview = preview_rename(file_path, new_name, dest)
+                    if dest and "error" not in preview:
+                        valid_dests[dest] = Path(dest)
+
+                if dry_run:
+                    preview["dry_run"] = True
+                    results[i] = preview
+                else:
+                    # Usage is recorded for the whole batch once the moves are done
+                    results[i] = _apply_preview(file_path, preview, None, document_type)
+            except Exception as e:
+                results[i] = {
+                    "success": False,
+                    "error": str(e),
+                    "original_path": str(file_path),
+                }
+
+    # Moves are blocking file system work (and copies across devices), so
+    # independent directories are worked on in parallel
+    if not dry_run and len(groups) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as pool:
+            list(pool.map(run_group, groups.values()))
+    else:
+        for indexes in groups.values():
+            run_group(indexes)
 
-        if dry_run:
-            preview = preview_rename(file_path, new_name, dest)
-            preview["dry_run"] = True
-            results.append(preview)
-            if "error" not in preview:
-                success_count += 1
-            else:
-                failure_count += 1
-        else:
-            result = apply_rename(
-                file_path,
-                new_name,
-                dest,
-                pattern_id=pattern_id,
-                document_type=document_type,
+    if dry_run:
+        success_count = sum("error" not in r for r in results)
+    else:
+        success_count = sum(bool(r.get("success")) for r in results)
+
+    # One history append and one patterns write for the batch
+    if store is not None and success_count:
+        doc_type = DocumentType.from_string(document_type or "general")
+        with _RECORD_LOCK:
+            store.record_usage_bulk(
+                (
+                    pattern_id,
+                    DocumentInfo(
+                        file_path=r["original_path"],
+                        original_name=r["original_name"],
+                        document_type=doc_type,
+                    ),
+                    r["new_name"],
+                )
+                for r in results
+                if r.get("success")
             )
-            results.append(result)
-            if result.get("success"):
-                success_count += 1
-            else:
-                failure_count += 1
 
     return {
         "total": len(renames),
         "success_count": success_count,
-        "failure_count": failure_count,
+        "failure_count": len(renames) - success_count,
         "dry_run": dry_run,
         "results": results,
     }
@@ -273,6 +521,19 @@ def create_rename_plan(
 
     plan = []
 
+    # One temporary rule applies the pattern to every file; applying a
+    # pattern doesn't depend on the rule's document type
+    rule = PatternRule(
+        id="temp",
+        document_type=DocumentType.GENERAL,
+        pattern=pattern,
+    )
+
+    # The shared destination is checked once; if it is missing, each file
+    # goes through preview_rename so it reports the error
+    dest_path = Path(destination_dir) if destination_dir else None
+    dest_valid = dest_path is None or dest_path.exists()
+
     for file_path, doc_info in zip(files, document_infos):
         # Create DocumentInfo from dict
         doc = DocumentInfo(
@@ -290,17 +551,13 @@ def create_rename_plan(
             description=doc_info.get("description"),
         )
 
-        # Create a temporary rule to apply the pattern
-        rule = PatternRule(
-            id="temp",
-            document_type=doc.document_type,
-            pattern=pattern,
-        )
-
         new_name = rule.apply_to_document(doc)
 
         # Get preview
-        preview = preview_rename(file_path, new_name, destination_dir)
+        if dest_valid:
+            preview = _build_preview(file_path, new_name, destination_dir, dest_path)
+        else:
+            preview = preview_rename(file_path, new_name, destination_dir)
         preview["document_info"] = doc_info
         preview["pattern_used"] = pattern
 
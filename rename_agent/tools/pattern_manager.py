@@ -1,5 +1,7 @@
 """Pattern management tools for the rename agent."""
 
+import threading
+from pathlib import Path
 from typing import Any, Optional
 
 from ..models.document import DocumentType, DocumentInfo, PatternRule
@@ -10,19 +12,97 @@ from ..patterns.default_patterns import DOCUMENT_TYPES
 # Global pattern store instance
 _store: Optional[PatternStore] = None
 
+# Serializes creating the global store, so concurrent first calls (e.g. from
+# batch rename workers) load it once
+_store_lock = threading.Lock()
+
 
 def get_store() -> PatternStore:
     """Get the global pattern store instance."""
     global _store
-    if _store is None:
-        _store = PatternStore()
-    return _store
+    store = _store
+    if store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PatternStore()
+            store = _store
+    return store
 
 
 def set_store(store: PatternStore):
     """Set the global pattern store instance (for testing/custom data dirs)."""
     global _store
-    _store = store
+    with _store_lock:
+        if _store is not None and _store is not store:
+            # Write the replaced store's deferred usage updates
+            _store.close()
+        _store = store
+
+
+def use_data_dir(data_dir: str) -> PatternStore:
+    """Point the global pattern store at a data directory.
+
+    The current store is kept if it already uses that directory, so
+    repeated calls don't reload patterns and history from disk.
+
+    Args:
+        data_dir: Directory for storing pattern data
+
+    Returns:
+        The global pattern store
+    """
+    global _store
+    with _store_lock:
+        if _store is None or _store.data_dir != Path(data_dir):
+            if _store is not None:
+                # Write the replaced store's deferred usage updates
+                _store.close()
+            _store = PatternStore(data_dir)
+        return _store
+
+
+# Results of read-only queries for the current store revision. Callers get
+# their own copy, so changing a returned result never alters the cache.
+_cache: dict[tuple, Any] = {}
+_cache_store: Optional[PatternStore] = None
+_cache_revision = -1
+_cache_lock = threading.Lock()
+
+
+def _copy_result(value: Any) -> Any:
+    """Copy JSON-like data (nested dicts and lists); much cheaper than deepcopy."""
+    if isinstance(value, dict):
+        return {k: _copy_result(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_result(v) for v in value]
+    return value
+
+
+def _cached(key: tuple, build):
+    """Return build(store) for the current store, reusing the last result until it changes."""
+    global _cache_store, _cache_revision
+    store = get_store()
+    with _cache_lock:
+        if store is not _cache_store or store.revision != _cache_revision:
+            _cache.clear()
+            _cache_store = store
+            _cache_revision = store.revision
+        if key not in _cache:
+            _cache[key] = build(store)
+        return _copy_result(_cache[key])
+
+
+# Document type descriptions are static, so build the listing once
+_DOCUMENT_TYPE_LIST = tuple(
+    {
+        "type": doc_type.value,
+        "name": info["name"],
+        "description": info["description"],
+        "keywords": info["keywords"],
+        "extract_fields": info["extract_fields"],
+    }
+    for doc_type, info in DOCUMENT_TYPES.items()
+)
 
 
 def list_document_types() -> list[dict[str, Any]]:
@@ -31,16 +111,7 @@ def list_document_types() -> list[dict[str, Any]]:
     Returns:
         List of document type info dicts
     """
-    result = []
-    for doc_type, info in DOCUMENT_TYPES.items():
-        result.append({
-            "type": doc_type.value,
-            "name": info["name"],
-            "description": info["description"],
-            "keywords": info["keywords"],
-            "extract_fields": info["extract_fields"],
-        })
-    return result
+    return list(_DOCUMENT_TYPE_LIST)
 
 
 def get_patterns(document_type: Optional[str] = None) -> list[dict[str, Any]]:
@@ -52,15 +123,16 @@ def get_patterns(document_type: Optional[str] = None) -> list[dict[str, Any]]:
     Returns:
         List of pattern dicts
     """
-    store = get_store()
+    doc_type = DocumentType.from_string(document_type) if document_type else None
 
-    if document_type:
-        doc_type = DocumentType.from_string(document_type)
-        patterns = store.get_patterns_for_type(doc_type)
-    else:
-        patterns = store.get_all_patterns()
+    def build(store: PatternStore) -> list[dict[str, Any]]:
+        if doc_type:
+            patterns = store.get_patterns_for_type(doc_type)
+        else:
+            patterns = store.get_all_patterns()
+        return [p.to_dict() for p in patterns]
 
-    return [p.to_dict() for p in patterns]
+    return _cached(("patterns", doc_type), build)
 
 
 def get_pattern_for_type(
@@ -256,21 +328,19 @@ def get_pattern_stats() -> dict[str, Any]:
     Returns:
         Stats dict with counts by type, total patterns, etc.
     """
-    store = get_store()
-    return store.get_stats()
+    return _cached(("stats",), lambda store: store.get_stats())
 
 
 def get_rename_history(limit: int = 50) -> list[dict[str, Any]]:
     """Get recent rename history.
 
     Args:
-        limit: Maximum number of entries to return
+        limit: Maximum number of entries to return (0 for all)
 
     Returns:
         List of history entries, most recent first
     """
-    store = get_store()
-    return store.get_history(limit)
+    return _cached(("history", limit), lambda store: store.get_history(limit))
 
 
 def apply_pattern_to_document(